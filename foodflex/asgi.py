@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodflex.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from foodflex.warmup import lifespan
+
+
+async def application(scope, receive, send):
+    # Django does not implement the lifespan protocol; servers that send it (uvicorn) get
+    # the worker warmed up before it accepts connections
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    else:
+        await django_application(scope, receive, send)
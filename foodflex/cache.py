@@ -0,0 +1,87 @@
+# foodflex/cache.py
+"""Full-page cache for public pages served to anonymous visitors.
+
+Only requests without a session, JWT or flash-message cookie (and without an
+Authorization header) are served from the cache; everyone else gets the view
+as before. Pages embed a CSRF token bound to the visitor's cookie, so the
+token is stored as a placeholder and filled in per request. Responses carry a
+weak ETag over the cached bytes and ``Vary: Cookie, Authorization``.
+"""
+import hashlib
+import re
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+
+VARY_HEADERS = ('Cookie', 'Authorization')
+BYPASS_COOKIES = ('access_token', 'messages')
+CSRF_INPUT = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_PLACEHOLDER = b'__page_cache_csrf_token__'
+
+def page_cache_seconds():
+    return getattr(settings, 'PAGE_CACHE_SECONDS', 0)
+
+def bypass_page_cache(request):
+    """True when the response may depend on who is asking."""
+    if request.method not in ('GET', 'HEAD') or 'Authorization' in request.headers:
+        return True
+    return any(name in request.COOKIES for name in (settings.SESSION_COOKIE_NAME, *BYPASS_COOKIES))
+
+def page_cache_key(request):
+    return 'pagecache:' + hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+
+def is_cacheable(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not response.has_header('Cache-Control')
+    )
+
+def etag_matches(request, etag):
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    # Weak comparison, as for any GET/HEAD conditional request
+    return '*' in etags or etag.removeprefix('W/') in {tag.removeprefix('W/') for tag in etags}
+
+def cache_anonymous_page(view):
+    """Serve ``view`` from the page cache for anonymous GET/HEAD requests."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        timeout = page_cache_seconds()
+        if not timeout or bypass_page_cache(request):
+            response = view(request, *args, **kwargs)
+            patch_vary_headers(response, VARY_HEADERS)
+            return response
+
+        key = page_cache_key(request)
+        entry = cache.get(key)
+        state = 'HIT'
+        if entry is None:
+            response = view(request, *args, **kwargs)
+            if not is_cacheable(response):
+                patch_vary_headers(response, VARY_HEADERS)
+                return response
+            body = CSRF_INPUT.sub(rb'\g<1>' + CSRF_PLACEHOLDER + rb'\g<2>', response.content)
+            entry = (body, response['Content-Type'], f'W/"{hashlib.md5(body).hexdigest()}"')
+            cache.set(key, entry, timeout)
+            state = 'MISS'
+
+        body, content_type, etag = entry
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            if CSRF_PLACEHOLDER in body:
+                # get_token() also makes CsrfViewMiddleware send this visitor's CSRF cookie
+                body = body.replace(CSRF_PLACEHOLDER, get_token(request).encode())
+            response = HttpResponse(body, content_type=content_type)
+        response['ETag'] = etag
+        response['X-Page-Cache'] = state
+        patch_vary_headers(response, VARY_HEADERS)
+        # The page holds a per-visitor CSRF token: browsers may keep it, shared caches may not
+        patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+        return response
+    return wrapper
@@ -0,0 +1,97 @@
+# foodflex/conditional.py
+"""Conditional GET for views whose content can be versioned without building it.
+
+``conditional(validator)`` wraps a view (sync or async, or an APIView method
+through ``method_decorator``). The validator gets the view's arguments and
+returns a cheap version of what the view would render: row counts and the
+latest ``updated_at`` from one aggregate query (``collection_version``) or
+a single row's ``updated_at``, always read from the database so that every
+worker agrees on it. The version is folded with what else the response
+depends on (the user, the CSRF cookie, the Accept header,
+``CONDITIONAL_GET_VERSION``) into a weak ETag. A request whose ``If-None-Match`` still matches gets a 304
+before the view runs; anything else runs the view and gets the ETag.
+"""
+import datetime
+import hashlib
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from .cache import VARY_HEADERS
+
+def collection_version(queryset, timestamp='updated_at'):
+    """``(rows, latest timestamp)`` of ``queryset`` in one query; changes when a row is added, edited or removed."""
+    result = queryset.aggregate(rows=Count('pk'), latest=Max(timestamp))
+    return result['rows'], result['latest']
+
+def make_etag(request, version):
+    user = getattr(request, 'user', None)
+    parts = (
+        getattr(settings, 'CONDITIONAL_GET_VERSION', ''),
+        getattr(user, 'pk', None),
+        # Pages embed a CSRF token derived from this cookie
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        request.headers.get('Accept'),
+        version,
+    )
+    return f'W/"{hashlib.md5(repr(parts).encode()).hexdigest()}"'
+
+def skip_conditional(request):
+    # Flash messages are shown once, by whichever response renders them
+    return request.method not in ('GET', 'HEAD') or 'messages' in request.COOKIES
+
+def check(validator, request, args, kwargs):
+    """Return ``None`` to run the view plainly, else ``(304 response or None, etag, last modified)``."""
+    if skip_conditional(request):
+        return None
+    version = validator(request, *args, **kwargs)
+    if version is None:
+        return None
+    etag = make_etag(request, version)
+    # Only a single row's timestamp is a safe Last-Modified; collections can lose rows without it moving
+    last_modified = int(version.timestamp()) if isinstance(version, datetime.datetime) else None
+    return get_conditional_response(request, etag=etag, last_modified=last_modified), etag, last_modified
+
+def finish(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, (*VARY_HEADERS, 'Accept'))
+        # Clients keep the body but ask again every time; shared caches must not store it
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def conditional(validator):
+    """Answer 304 Not Modified when ``validator(request, *args, **kwargs)`` is unchanged.
+
+    The validator returns ``None`` when it cannot tell (e.g. the object does
+    not exist), in which case the view runs as usual. If the data changes
+    between the validator and the view, the response carries the older
+    version's ETag, so the client's next request simply misses.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                result = await sync_to_async(check)(validator, request, args, kwargs)
+                if result is None:
+                    return await view(request, *args, **kwargs)
+                response, etag, last_modified = result
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return finish(response, etag, last_modified)
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                result = check(validator, request, args, kwargs)
+                if result is None:
+                    return view(request, *args, **kwargs)
+                response, etag, last_modified = result
+                if response is None:
+                    response = view(request, *args, **kwargs)
+                return finish(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,45 @@
+# foodflex/db.py
+"""SQLite connection tuning applied to every new database connection.
+
+The defaults suit a single-host production deployment: WAL lets readers run
+alongside the single writer, busy_timeout makes writers queue instead of
+failing with "database is locked", and synchronous=NORMAL is durable under WAL
+except for the last transactions before a power loss. Override any pragma with
+``SQLITE_PRAGMAS`` in settings; set a pragma to ``None`` to leave SQLite's default.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,         # Milliseconds a writer waits for the lock
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64000,         # Negative values are KiB, i.e. 64 MB per connection
+    'temp_store': 'MEMORY',
+}
+
+def sqlite_pragmas():
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+    pragmas.update(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    return {name: value for name, value in pragmas.items() if value is not None}
+
+def apply_sqlite_pragmas(cursor, pragmas):
+    """Run ``PRAGMA name = value`` for each pragma on a DB-API cursor."""
+    for name, value in pragmas.items():
+        if not name.replace('_', '').isalnum():
+            raise ValueError(f"Invalid SQLite pragma name: {name!r}")
+        if not str(value).replace('-', '').replace('_', '').isalnum():
+            raise ValueError(f"Invalid value for SQLite pragma {name}: {value!r}")
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_sqlite_pragmas(cursor, sqlite_pragmas())
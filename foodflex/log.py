@@ -0,0 +1,236 @@
+# foodflex/log.py
+"""Logging that stays off the request path.
+
+``BackgroundHandler`` only puts records on a queue; a ``QueueListener``
+thread formats them (as JSON with ``JSONFormatter``) and writes them, so a
+request never waits on the stream. ``SamplingFilter`` keeps a fraction of
+the records from chatty loggers and ``RateLimitFilter`` caps how often any
+one message may repeat; both run before a record is queued and never drop
+warnings or errors. ``payload()`` wraps request data for logging: it is
+rendered only for records that pass the level and the filters, with
+secrets redacted and everything truncated, so the cost of a log line does
+not grow with the request.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+REDACTED_KEYS = ('password', 'token', 'secret', 'refresh', 'access', 'authorization', 'bank', 'account')
+PAYLOAD_MAX_KEYS = 20
+PAYLOAD_MAX_VALUE = 64
+PAYLOAD_MAX_LENGTH = 512
+
+# LogRecord attributes that are not ``extra=`` fields
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'suppressed'}
+
+class Payload:
+    """Lazily rendered, redacted and truncated view of request or serializer data."""
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    @staticmethod
+    def value(key, value):
+        if any(word in str(key).lower() for word in REDACTED_KEYS):
+            return '[redacted]'
+        if isinstance(value, (list, tuple)) and len(value) == 1:
+            value = value[0]
+        if hasattr(value, 'read') and hasattr(value, 'name'):
+            # Uploaded files: name and size, never the content
+            return f'<file {value.name} {getattr(value, "size", "?")} bytes>'
+        text = str(value)
+        return text if len(text) <= PAYLOAD_MAX_VALUE else text[:PAYLOAD_MAX_VALUE] + '...'
+
+    def __str__(self):
+        data = self.data
+        if not hasattr(data, 'items'):
+            text = str(data)
+            return text if len(text) <= PAYLOAD_MAX_LENGTH else text[:PAYLOAD_MAX_LENGTH] + '...'
+        keys = list(data.keys())
+        # QueryDict.items() yields only the last value per key; lists() keeps them all
+        items = data.lists() if hasattr(data, 'lists') else data.items()
+        shown = {}
+        for key, value in items:
+            if len(shown) == PAYLOAD_MAX_KEYS:
+                break
+            shown[str(key)] = self.value(key, value)
+        text = json.dumps(shown, default=str)
+        if len(keys) > len(shown):
+            text += f' (+{len(keys) - len(shown)} more keys)'
+        return text if len(text) <= PAYLOAD_MAX_LENGTH else text[:PAYLOAD_MAX_LENGTH] + '...'
+
+    __repr__ = __str__
+
+def payload(data):
+    return Payload(data)
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, ``extra=`` fields and any traceback."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """Keep ``rates[logger]`` (0-1) of the records below WARNING from a logger and its children.
+
+    ``rates`` is keyed by logger name; the longest matching prefix wins and
+    unlisted loggers keep everything.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.resolved = {}
+
+    def rate(self, name):
+        if name not in self.resolved:
+            rate, probe = 1.0, name
+            while True:
+                if probe in self.rates:
+                    rate = self.rates[probe]
+                    break
+                if '.' not in probe:
+                    break
+                probe = probe.rsplit('.', 1)[0]
+            self.resolved[name] = rate
+        return self.resolved[name]
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1 or random.random() < rate
+
+class RateLimitFilter(logging.Filter):
+    """Let each message template through at most ``burst`` times per ``period`` seconds.
+
+    Messages are told apart by logger and unformatted template, so the
+    limit only works for %-style calls. The next record let through after
+    a quiet spell carries how many were dropped as ``suppressed``. WARNING
+    and above are never limited.
+    """
+
+    def __init__(self, burst=20, period=60.0):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.lock = threading.Lock()
+        self.windows = {}  # (logger, template) -> [window start, count, suppressed]
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg if isinstance(record.msg, str) else type(record.msg).__name__)
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None or now - window[0] >= self.period:
+                suppressed = window[2] if window else 0
+                if len(self.windows) > 10000:
+                    self.windows.clear()
+                self.windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+class BackgroundHandler(QueueHandler):
+    """Queue records for a listener thread that formats and writes them to ``stream`` (stderr).
+
+    The queue is bounded: when it is full records are dropped rather than
+    blocking the caller, and a warning with the count is written once there
+    is room again. A forked child (e.g. a gunicorn worker) starts its own
+    listener.
+    """
+
+    def __init__(self, stream=None, queue_size=10000):
+        self.queue_size = queue_size
+        super().__init__(queue.Queue(queue_size))
+        self.target = logging.StreamHandler(stream)
+        self.dropped = 0
+        self.start()
+        atexit.register(self.stop)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self.restart)
+
+    def start(self):
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+
+    def restart(self):
+        # The parent's listener thread does not exist in a forked child
+        self.queue = queue.Queue(self.queue_size)
+        self.start()
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Merge the arguments now, while they still hold what they held at the call; only
+        # records that got past the level and filters reach this point. JSON encoding and
+        # the write happen on the listener thread.
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.dropped:
+                notice = logging.LogRecord(
+                    __name__, logging.WARNING, __file__, 0, "Log queue was full; dropped %d records", (self.dropped,), None,
+                )
+                self.queue.put_nowait(notice)
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Wait until every queued record has been written (for tests and shutdown)."""
+        if self.listener is not None and self.listener._thread is not None:
+            self.listener.stop()
+            self.start()
+        self.target.flush()
+
+    def close(self):
+        self.stop()
+        self.target.close()
+        super().close()
@@ -0,0 +1,374 @@
+# foodflex/metrics.py
+"""Per-request performance metrics, served to staff at /metrics in Prometheus text format.
+
+MetricsMiddleware times each request by view. A database execute wrapper
+counts and times the request's queries. The template backend and cache
+backend below add template render times and cache hits and misses.
+
+Numbers are kept per process. Point METRICS_DIR at a directory shared by the
+server's worker processes: each process then writes its numbers there every
+few seconds, and /metrics reports the sum over all of them. A request slower
+than SLOW_REQUEST_MS is logged together with the SQL it ran.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.utils.module_loading import import_string
+import logging
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger('foodflex.slow_requests')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+MAX_CAPTURED_QUERIES = 100
+FLUSH_SECONDS = 5
+
+# name: (type, help, histogram buckets)
+METRICS = {
+    'foodflex_http_requests_total': ('counter', 'Requests by view, method and status.', None),
+    'foodflex_http_request_duration_seconds': ('histogram', 'Time to produce a response, by view.', LATENCY_BUCKETS),
+    'foodflex_http_slow_requests_total': ('counter', 'Requests over SLOW_REQUEST_MS, by view.', None),
+    'foodflex_db_queries_per_request': ('histogram', 'Database queries run by one request, by view.', QUERY_COUNT_BUCKETS),
+    'foodflex_db_query_duration_seconds_total': ('counter', 'Time spent in database queries, by view.', None),
+    'foodflex_template_render_duration_seconds': ('histogram', 'Time to render a page template, by template.', LATENCY_BUCKETS),
+    'foodflex_cache_requests_total': ('counter', 'Cache lookups by key family and result (hit or miss).', None),
+}
+
+class Registry:
+    """Counters and histograms keyed by metric name and a sorted tuple of label pairs."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = METRICS[name][2]
+        with self.lock:
+            sample = self.histograms.get(key)
+            if sample is None:
+                # Per-bucket counts (not cumulative), then sum and count
+                sample = self.histograms[key] = [0] * len(buckets) + [0.0, 0]
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    sample[index] += 1
+                    break
+            sample[-2] += value
+            sample[-1] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, labels, value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, labels, list(sample)] for (name, labels), sample in self.histograms.items()],
+            }
+
+    def clear(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+registry = Registry()
+
+def merge(snapshots):
+    counters, histograms = {}, {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, sample in snapshot['histograms']:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            merged = histograms.setdefault(key, [0] * len(sample))
+            histograms[key] = [total + value for total, value in zip(merged, sample)]
+    return counters, histograms
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None)
+
+_last_flush = 0.0
+
+def flush(force=False):
+    """Write this process's numbers to METRICS_DIR, at most every FLUSH_SECONDS."""
+    global _last_flush
+    directory = metrics_dir()
+    now = time.monotonic()
+    if not directory or (not force and now - _last_flush < FLUSH_SECONDS):
+        return
+    _last_flush = now
+    path = os.path.join(directory, f'{os.getpid()}.json')
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(f'{path}.tmp', 'w') as handle:
+            json.dump(registry.snapshot(), handle)
+        os.replace(f'{path}.tmp', path)
+    except OSError as e:
+        logger.warning("Could not write metrics to %s: %s", path, e)
+
+def collect():
+    """This process's live numbers plus those the other worker processes last wrote."""
+    snapshots = [registry.snapshot()]
+    directory = metrics_dir()
+    if directory and os.path.isdir(directory):
+        own = f'{os.getpid()}.json'
+        for filename in os.listdir(directory):
+            if filename.endswith('.json') and filename != own:
+                try:
+                    with open(os.path.join(directory, filename)) as handle:
+                        snapshots.append(json.load(handle))
+                except (OSError, ValueError):
+                    continue
+    return merge(snapshots)
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')) for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_metrics(counters, histograms, gauges=()):
+    """Prometheus text exposition of merged counters, histograms and ``(name, help, samples)`` gauges."""
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{format_labels(labels)} {format_number(value)}')
+            continue
+        for (metric, labels), sample in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(buckets, sample):
+                cumulative += count
+                lines.append(f'{name}_bucket{format_labels(labels + (("le", format_number(bound)),))} {cumulative}')
+            lines.append(f'{name}_bucket{format_labels(labels + (("le", "+Inf"),))} {sample[-1]}')
+            lines.append(f'{name}_sum{format_labels(labels)} {format_number(sample[-2])}')
+            lines.append(f'{name}_count{format_labels(labels)} {sample[-1]}')
+    for name, help_text, samples in gauges:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+        lines += [f'{name}{format_labels(labels)} {format_number(value)}' for labels, value in samples]
+    return '\n'.join(lines) + '\n'
+
+class RequestMetrics:
+    """What one request spent its time on; reachable from any thread serving it via ``current_request``."""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.captured = []
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.query_seconds += seconds
+        if len(self.captured) < MAX_CAPTURED_QUERIES:
+            self.captured.append((seconds, sql))
+
+current_request = contextvars.ContextVar('foodflex_request_metrics', default=None)
+
+def record_query(execute, sql, params, many, context):
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_query(sql, time.perf_counter() - started)
+
+def install_query_recorder(sender, connection, **kwargs):
+    # Connections are per thread (under ASGI sync views run in a worker thread), so every one gets the
+    # wrapper as it connects; the context variable then finds the request it is working for
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+connection_created.connect(install_query_recorder)
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unresolved'
+
+class MetricsMiddleware:
+    """Record latency, query count and time per view; log slow requests with their SQL."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def finish(self, request, response, stats, elapsed):
+        view = view_label(request)
+        registry.inc('foodflex_http_requests_total', view=view, method=request.method, status=str(response.status_code))
+        registry.observe('foodflex_http_request_duration_seconds', elapsed, view=view)
+        registry.observe('foodflex_db_queries_per_request', stats.queries, view=view)
+        registry.inc('foodflex_db_query_duration_seconds_total', stats.query_seconds, view=view)
+
+        budget = getattr(settings, 'SLOW_REQUEST_MS', 0)
+        if budget and elapsed * 1000 > budget:
+            registry.inc('foodflex_http_slow_requests_total', view=view)
+            statements = '\n'.join(f"  {seconds * 1000:8.1f} ms  {sql}" for seconds, sql in stats.captured)
+            slow_logger.warning(
+                "Slow request %s %s (%s): %.0f ms, %s queries in %.0f ms, templates %.0f ms, cache %s hits / %s misses\n%s",
+                request.method, request.path, view, elapsed * 1000, stats.queries, stats.query_seconds * 1000,
+                stats.template_seconds * 1000, stats.cache_hits, stats.cache_misses, statements,
+            )
+        flush()
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestMetrics()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        stats = RequestMetrics()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - started)
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.observe('foodflex_template_render_duration_seconds', elapsed, template=self.origin.template_name or '<string>')
+            stats = current_request.get()
+            if stats is not None:
+                stats.template_seconds += elapsed
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing every page render."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+def cache_key_family(key):
+    """A low-cardinality label for a cache key: its prefix, or the fragment name for {% cache %}."""
+    if key.startswith('template.cache.'):
+        return key.rsplit('.', 1)[0]
+    return key.split(':', 1)[0] if ':' in key else 'other'
+
+MISSING = object()
+
+class InstrumentedCache(BaseCache):
+    """Count hits and misses, then hand every call to the backend named in WRAPPED_BACKEND."""
+
+    def __init__(self, location, params):
+        params = params.copy()
+        backend = params.pop('WRAPPED_BACKEND')
+        super().__init__(params)
+        self.backend = import_string(backend)(location, params)
+
+    def record(self, key, hit):
+        registry.inc('foodflex_cache_requests_total', family=cache_key_family(key), result='hit' if hit else 'miss')
+        stats = current_request.get()
+        if stats is not None:
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+
+    def get(self, key, default=None, version=None):
+        value = self.backend.get(key, MISSING, version=version)
+        self.record(key, value is not MISSING)
+        return default if value is MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = self.backend.get_many(keys, version=version)
+        for key in keys:
+            self.record(key, key in found)
+        return found
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.backend.add(key, value, timeout=timeout, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.backend.set(key, value, timeout=timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.backend.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        return self.backend.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.backend.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        return self.backend.incr(key, delta=delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.backend.decr(key, delta=delta, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.backend.set_many(data, timeout=timeout, version=version)
+
+    def delete_many(self, keys, version=None):
+        return self.backend.delete_many(keys, version=version)
+
+    def clear(self):
+        return self.backend.clear()
+
+    def close(self, **kwargs):
+        return self.backend.close(**kwargs)
+
+def task_gauges():
+    from users.queue import task_metrics
+    samples = [
+        ((('name', name), ('status', status)), count)
+        for name, metrics in task_metrics().items() for status, count in metrics['counts'].items()
+    ]
+    return ('foodflex_tasks', 'Background tasks by name and status.', samples)
+
+def metrics_view(request):
+    if not request.user.is_staff:
+        return HttpResponseForbidden("Staff only.")
+    counters, histograms = collect()
+    return HttpResponse(render_metrics(counters, histograms, [task_gauges()]), content_type=CONTENT_TYPE)
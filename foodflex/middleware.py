@@ -1,18 +1,31 @@
 # foodflex/middleware.py
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .routers import reset_replica_state, wrote_to_primary
 import logging
 
 logger = logging.getLogger(__name__)
 
 class JWTMiddleware:
+    """Require a session or a valid JWT (Authorization header or access_token cookie) outside public paths.
+
+    Works in both sync and async stacks, so under ASGI it adds no thread hop of its own.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
         self.jwt_authenticator = JWTAuthentication()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
-    def __call__(self, request):
+    def is_exempt(self, request):
         public_paths = [
             reverse('users:landing'),
             reverse('users:signup'),
@@ -35,38 +48,120 @@ class JWTMiddleware:
         if (request.path in public_paths or
                 any(request.path.startswith(admin_path) for admin_path in admin_paths) or
                 request.path == token_refresh_path):
-            logger.debug(f"Public, admin, or token refresh path accessed, skipping JWT authentication: {request.path}")
-            return self.get_response(request)
+            logger.debug("Public, admin, or token refresh path accessed, skipping JWT authentication: %s", request.path)
+            return True
+        return False
 
-        if request.user.is_authenticated:
-            logger.debug(f"User authenticated via session for path {request.path}: {request.user.email}")
-            return self.get_response(request)
+    def authenticate(self, request):
+        """Return the JWT user for ``request``, or a redirect to the landing page."""
         auth_header = request.headers.get('Authorization', None)
         token = None
         if auth_header:
             if auth_header.startswith('Bearer '):
                 token = auth_header.split(' ')[1]
-                logger.debug(f"Found token in Authorization header: {token}")
+                logger.debug("Found token in Authorization header for path: %s", request.path)
             else:
-                logger.warning(f"Invalid Authorization header format for path: {request.path}, header: {auth_header}")
+                logger.warning("Invalid Authorization header format for path: %s", request.path)
         else:
             token = request.COOKIES.get('access_token')
             if token:
-                logger.debug(f"Found token in cookies: {token}")
+                logger.debug("Found token in cookies for path: %s", request.path)
             else:
-                logger.warning(f"Missing Authorization header and cookie for path: {request.path}")
+                logger.warning("Missing Authorization header and cookie for path: %s", request.path)
                 return HttpResponseRedirect(reverse('users:landing'))
 
         try:
             validated_token = self.jwt_authenticator.get_validated_token(token)
             user = self.jwt_authenticator.get_user(validated_token)
-            request.user = user
-            logger.debug(f"User authenticated via JWT for path {request.path}: {user.email}")
+            logger.debug("User authenticated via JWT for path %s: %s", request.path, user.pk)
+            return user
         except (InvalidToken, TokenError) as e:
-            logger.warning(f"Invalid token for path: {request.path}, error: {str(e)}")
+            logger.warning("Invalid token for path: %s, error: %s", request.path, e)
             return HttpResponseRedirect(reverse('users:landing'))
         except Exception as e:
-            logger.error(f"Error during JWT authentication for path {request.path}: {str(e)}", exc_info=True)
+            logger.error("Error during JWT authentication for path %s: %s", request.path, e, exc_info=True)
             return HttpResponseRedirect(reverse('users:landing'))
 
-        return self.get_response(request)
\ No newline at end of file
+    def set_user(self, request, user):
+        async def auser():
+            return user
+        # Sync code reads request.user, async code awaits request.auser()
+        request.user = user
+        request.auser = auser
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.is_exempt(request):
+            return self.get_response(request)
+        if request.user.is_authenticated:
+            logger.debug("User authenticated via session for path %s: %s", request.path, request.user.pk)
+            return self.get_response(request)
+        result = self.authenticate(request)
+        if isinstance(result, HttpResponseRedirect):
+            return result
+        self.set_user(request, result)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.is_exempt(request):
+            return await self.get_response(request)
+        user = await request.auser()
+        if user.is_authenticated:
+            logger.debug("User authenticated via session for path %s: %s", request.path, user.pk)
+            return await self.get_response(request)
+        result = await sync_to_async(self.authenticate)(request)
+        if isinstance(result, HttpResponseRedirect):
+            return result
+        self.set_user(request, result)
+        return await self.get_response(request)
+
+class ReplicaStickinessMiddleware:
+    """Keep a client's reads on the primary for a while after it writes.
+
+    A request that writes through the ORM sets a short-lived cookie; while it
+    is present, read_from_replica() blocks for that client use the primary.
+    """
+    cookie_name = 'primary_pin'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def start(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            pinned_until = 0
+        reset_replica_state(pinned=pinned_until > time.time())
+
+    def finish(self, response, wrote):
+        if wrote:
+            sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 15)
+            response.set_cookie(
+                self.cookie_name, str(time.time() + sticky_seconds), max_age=sticky_seconds, httponly=True, samesite='Lax'
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.start(request)
+        try:
+            response = self.get_response(request)
+            wrote = wrote_to_primary()
+        finally:
+            reset_replica_state()
+        return self.finish(response, wrote)
+
+    async def __acall__(self, request):
+        self.start(request)
+        try:
+            response = await self.get_response(request)
+            wrote = wrote_to_primary()
+        finally:
+            reset_replica_state()
+        return self.finish(response, wrote)
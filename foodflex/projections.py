@@ -0,0 +1,109 @@
+# foodflex/projections.py
+"""Read-only serialization straight from ``.values()`` rows.
+
+A ``ModelSerializer`` builds a model instance per row and then walks its
+fields one by one (attribute lookup, ``SkipField`` checks, a
+``to_representation`` call) for every value. ``Projection`` reads the same
+serializer's fields once, selects only their columns with ``.values()``,
+and keeps one mapper per field: none for values that are already JSON-ready
+(text, numbers, booleans), the field's own ``to_representation`` for the
+rest, and a storage URL for files. The rows it returns match
+``serializer_class(queryset, many=True).data``. The serializer is still
+used for everything it writes.
+"""
+from decimal import Decimal
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils.encoding import filepath_to_uri
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+# Fields whose representation of a non-null database value is the value itself
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField, serializers.ChoiceField)
+
+def file_url(model_field, field, request):
+    storage = model_field.storage
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+    # FileSystemStorage.url() urljoins base_url with the quoted name, which for a name
+    # without dot segments is plain concatenation; other storages are asked each time
+    base_url = storage.base_url if isinstance(storage, FileSystemStorage) else None
+
+    def mapper(name):
+        if not name:
+            return None
+        if not use_url:
+            return name
+        path = filepath_to_uri(name).lstrip('/') if base_url is not None else None
+        url = base_url + path if path is not None and '/.' not in '/' + path else storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return mapper
+
+def decimal_as_text(field):
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    return coerce_to_string and not field.localize and field.decimal_places is not None
+
+def decimal_text(field):
+    # DecimalField quantizes to decimal_places first; a value read from a column with
+    # that many places already has them, so only the formatting is left
+    exponent = -field.decimal_places
+    represent = field.to_representation
+
+    def mapper(value):
+        if isinstance(value, Decimal) and value.as_tuple().exponent == exponent:
+            return format(value, 'f')
+        return represent(value)
+    return mapper
+
+class Projection:
+    """``.values()``-based, read-only twin of ``serializer_class`` for a ModelSerializer."""
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self._fields = None
+
+    @property
+    def fields(self):
+        # Built on first use: serializer fields need the app registry
+        if self._fields is None:
+            model = self.serializer_class.Meta.model
+            fields = []
+            for name, field in self.serializer_class().fields.items():
+                if field.write_only:
+                    continue
+                if field.source == '*' or '.' in field.source:
+                    raise ValueError(f"{self.serializer_class.__name__}.{name} is not a plain column; Projection cannot read it.")
+                fields.append((name, field.source, field, model._meta.get_field(field.source)))
+            self._fields = fields
+        return self._fields
+
+    def mappers(self, request=None):
+        mappers = []
+        for name, source, field, model_field in self.fields:
+            if isinstance(model_field, models.FileField):
+                mapper = file_url(model_field, field, request)
+            elif isinstance(field, serializers.DecimalField) and decimal_as_text(field):
+                mapper = decimal_text(field)
+            elif isinstance(field, PASSTHROUGH_FIELDS) and not isinstance(field, serializers.MultipleChoiceField):
+                mapper = None
+            else:
+                mapper = field.to_representation
+            mappers.append((name, source, mapper))
+        return mappers
+
+    def rows(self, queryset, request=None):
+        """Serialize every row of ``queryset``; ``request`` makes file URLs absolute, as in DRF."""
+        mappers = self.mappers(request)
+        columns = list(dict.fromkeys(source for _, source, _ in mappers))
+        data = []
+        for row in queryset.values(*columns):
+            item = {}
+            for name, source, mapper in mappers:
+                value = row[source]
+                # As in DRF, None is never passed to a field's to_representation
+                item[name] = mapper(value) if mapper is not None and value is not None else value
+            data.append(item)
+        return data
+
+    def first(self, queryset, request=None):
+        rows = self.rows(queryset[:1], request)
+        return rows[0] if rows else None
@@ -0,0 +1,33 @@
+# foodflex/renderers.py
+"""DRF JSON renderer backed by orjson when it is installed.
+
+``FastJSONRenderer`` produces the same compact UTF-8 JSON as DRF's
+``JSONRenderer``: anything orjson does not encode natively (Decimal, lazy
+translations, querysets, and datetimes, which DRF shortens to milliseconds)
+goes through DRF's own encoder. Indented output (the browsable API) and
+installs without orjson fall back to ``JSONRenderer``.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+encoder = JSONEncoder()
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        plain = orjson is not None and data is not None and not self.ensure_ascii and self.compact
+        if not plain or self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=encoder.default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. integers beyond 64 bits, which the standard library handles
+            return super().render(data, accepted_media_type, renderer_context)
+        # Like JSONRenderer, escape the two characters that are valid JSON but not valid JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
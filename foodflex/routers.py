@@ -0,0 +1,57 @@
+# foodflex/routers.py
+"""Send reporting reads to a replica database while keeping read-your-writes.
+
+Only code wrapped in ``read_from_replica()`` is routed; every other query, and
+every write, uses ``default``. Once a request writes (or a client wrote within
+``REPLICA_STICKY_SECONDS``, see ReplicaStickinessMiddleware) its reads stay on
+the primary so users never see data older than their own changes.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+def replica_alias():
+    """The configured replica alias, or ``None`` when no replica database is set up."""
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    return alias if alias and alias in connections.settings else None
+
+@contextmanager
+def read_from_replica():
+    """Route reads inside the block (or decorated view) to the replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+def reset_replica_state(pinned=False):
+    """Start a unit of work (a request); ``pinned`` keeps its reads on the primary."""
+    _pinned_to_primary.set(pinned)
+    _wrote.set(False)
+
+def wrote_to_primary():
+    return _wrote.get()
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not _pinned_to_primary.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Read-your-writes: later reads in this request go to the primary
+        _pinned_to_primary.set(True)
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
@@ -37,7 +37,9 @@ SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
 
 MIDDLEWARE = [
+    'foodflex.metrics.MetricsMiddleware',  # Outermost, so it times everything below
     'django.middleware.security.SecurityMiddleware',
+    'foodflex.middleware.ReplicaStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -60,6 +62,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'foodflex.renderers.FastJSONRenderer',  # orjson when installed, DRF's JSONRenderer otherwise
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 CORS_ALLOWED_ORIGINS = ['http://127.0.0.1:8000']
@@ -68,12 +74,42 @@ CORS_ALLOW_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS']
 CORS_ALLOW_HEADERS = ['content-type', 'x-csrftoken', 'authorization']
 
 # Logging for debugging
+# Records are queued and written as JSON lines by a background thread (LOG_FORMAT=text for
+# plain lines). Chatty per-request INFO loggers are sampled and any one message may repeat at
+# most LOG_RATE_LIMIT_BURST times per LOG_RATE_LIMIT_PERIOD seconds; warnings and errors are never sampled.
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+LOG_SAMPLE_RATES = {
+    'vendor.views': 0.1,
+    'vendor.serializers': 0.1,
+    'users.serializers': 0.1,
+}
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'foodflex.log.JSONFormatter',
+        },
+        'text': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'filters': {
+        'sample': {
+            '()': 'foodflex.log.SamplingFilter',
+            'rates': LOG_SAMPLE_RATES,
+        },
+        'rate_limit': {
+            '()': 'foodflex.log.RateLimitFilter',
+            'burst': int(os.environ.get('LOG_RATE_LIMIT_BURST', 20)),
+            'period': float(os.environ.get('LOG_RATE_LIMIT_PERIOD', 60)),
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            'class': 'foodflex.log.BackgroundHandler',
+            'formatter': LOG_FORMAT,
+            'filters': ['sample', 'rate_limit'],
         },
     },
     'loggers': {
@@ -85,10 +121,19 @@ LOGGING = {
 }
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates, timing each page render for /metrics
+        "BACKEND": "foodflex.metrics.InstrumentedDjangoTemplates",
         'DIRS': [BASE_DIR / 'templates'],
-        "APP_DIRS": True,
+        "APP_DIRS": False,
         "OPTIONS": {
+            # Compile each template once per process; runserver's autoreloader still resets
+            # this cache when a template file changes
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -106,7 +151,63 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock at BEGIN so busy_timeout applies; a deferred
+            # transaction that upgrades from read to write fails immediately instead
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+# Reporting reads (dashboards, earnings, admin changelists, exports) go to this alias when it is
+# configured; set REPLICA_DATABASE_NAME to a replicated copy of the primary (e.g. Litestream/LiteFS).
+if os.environ.get('REPLICA_DATABASE_NAME'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['REPLICA_DATABASE_NAME'],
+        'TEST': {'MIRROR': 'default'},
     }
+DATABASE_ROUTERS = ['foodflex.routers.ReplicaRouter']
+REPLICA_DATABASE = 'replica'
+REPLICA_STICKY_SECONDS = 15  # Reads stay on the primary this long after a client writes
+
+# Per-process memory cache by default; point CACHE_BACKEND/CACHE_LOCATION at a shared backend
+# (e.g. django.core.cache.backends.redis.RedisCache or filebased.FileBasedCache) in production
+CACHES = {
+    'default': {
+        # Counts hits and misses for /metrics and passes every call on to WRAPPED_BACKEND
+        'BACKEND': 'foodflex.metrics.InstrumentedCache',
+        'WRAPPED_BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'foodflex'),
+        'TIMEOUT': 300,
+    }
+}
+PAGE_CACHE_SECONDS = 600  # Anonymous public pages (see foodflex/cache.py); 0 disables the page cache
+# Part of every conditional GET ETag (see foodflex/conditional.py); change it with releases that
+# change page markup or API responses, so clients do not keep the old ones
+CONDITIONAL_GET_VERSION = os.environ.get('CONDITIONAL_GET_VERSION', '')
+
+# Request metrics (see foodflex/metrics.py), served to staff at /metrics. Set METRICS_DIR to a
+# directory shared by all server worker processes to report their combined numbers.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+SLOW_REQUEST_MS = 500  # Slower requests are logged with their SQL; 0 turns the log off
+
+# Background tasks (see users/queue.py), run by `manage.py runworker`
+TASK_MAX_ATTEMPTS = 5
+TASK_VISIBILITY_TIMEOUT = 300  # Seconds a claimed task stays hidden before another worker may retry it
+TASK_RETRY_BASE_SECONDS = 10  # First retry delay; doubles with each attempt
+TASK_RETRY_MAX_SECONDS = 60 * 60
+
+# Outgoing mail; the console backend prints messages until an SMTP backend is configured
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'no-reply@foodflex.local')
+CONTACT_EMAIL = os.environ.get('CONTACT_EMAIL', 'support@foodflex.local')
+
+# PRAGMAs applied to every SQLite connection (see foodflex/db.py for the defaults)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,
+    'synchronous': 'NORMAL',
 }
 
 AUTHENTICATION_BACKENDS = [
@@ -3,10 +3,12 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenRefreshView
+from foodflex.metrics import metrics_view
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('users.urls')),
     path('vendor/', include('vendor.urls')),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('metrics', metrics_view, name='metrics'),
   
 ]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -0,0 +1,197 @@
+# foodflex/warmup.py
+"""Build the per-process state Django and DRF otherwise create on first use.
+
+A fresh worker pays for the URL resolver, template compilation, serializer
+field maps, the JWT backend, its first database connection and its empty
+page cache inside its first requests. ``warmup()`` does that work up front and is called from
+gunicorn's ``post_worker_init`` hook (gunicorn.conf.py), from the ASGI
+lifespan startup in foodflex/asgi.py and by ``manage.py warmup``. Each step
+is timed and a failing step is logged and skipped; warm-up never stops a
+worker from starting.
+"""
+import inspect
+import os
+import re
+import time
+from importlib import import_module
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.base import BaseHandler
+from django.db import connections
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+from django.urls import URLPattern, URLResolver, NoReverseMatch, get_resolver, reverse
+import logging
+
+logger = logging.getLogger(__name__)
+
+SERIALIZER_MODULES = ('users.serializers', 'vendor.serializers')
+# Public pages rendered once through the middleware stack; with the page cache on
+# this also fills this worker's copy of them
+WARMUP_PAGES = ('users:landing', 'users:signup', 'vendor:vendor_landing', 'vendor:vendor_signup')
+# Left out of warm-up requests, so they never show up in /metrics
+WARMUP_SKIPPED_MIDDLEWARE = ('foodflex.metrics.MetricsMiddleware',)
+
+def url_names(patterns=None, namespace=''):
+    """Yield ``(name, number of arguments)`` for every named URL, namespaced like reverse() wants."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            prefix = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            yield from url_names(pattern.url_patterns, prefix)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}{pattern.name}', pattern.pattern.regex.groups
+
+def warm_urls():
+    # Populates the resolver's reverse dictionaries and compiles every route's regex
+    resolver = get_resolver()
+    resolver.resolve('/')
+    count = 0
+    for name, arguments in url_names():
+        try:
+            reverse(name, args=[1] * arguments)
+            count += 1
+        except NoReverseMatch:
+            pass
+    return count
+
+def template_names():
+    directories = []
+    for engine in engines.all():
+        directories.extend(getattr(engine, 'template_dirs', ()))
+    directories.extend(get_app_template_dirs('templates'))
+    for directory in dict.fromkeys(str(directory) for directory in directories):
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(('.html', '.txt')):
+                    yield os.path.relpath(os.path.join(root, filename), directory)
+
+def warm_templates():
+    # The cached loader keeps each compiled template for the life of the process
+    count = 0
+    for name in dict.fromkeys(template_names()):
+        for engine in engines.all():
+            try:
+                engine.get_template(name)
+                count += 1
+                break
+            except Exception as e:
+                logger.debug("Skipping template %s: %s", name, e)
+    return count
+
+def warm_serializers():
+    from rest_framework import serializers
+    from .projections import Projection
+    count = 0
+    for module_name in SERIALIZER_MODULES:
+        module = import_module(module_name)
+        for _, member in inspect.getmembers(module):
+            if inspect.isclass(member) and issubclass(member, serializers.BaseSerializer) and member.__module__ == module_name:
+                # .fields builds the field map, the costly part of a ModelSerializer
+                member().fields
+                count += 1
+            elif isinstance(member, Projection):
+                member.fields
+                count += 1
+    return count
+
+def warm_jwt():
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.tokens import AccessToken
+    # Encoding and validating a token loads the signing backend and settings once
+    token = AccessToken()
+    token['user_id'] = 0
+    JWTAuthentication().get_validated_token(str(token))
+    return 1
+
+def warm_database():
+    # Connecting loads the backend's modules and checks the database is reachable; the
+    # connection itself is closed again below (CONN_MAX_AGE is 0)
+    for alias in connections:
+        connections[alias].ensure_connection()
+    # Model metadata (related objects, field caches) is built lazily on first access
+    for model in apps.get_models():
+        model._meta.get_fields()
+        model._meta.related_objects
+    return len(connections.all())
+
+def warm_caches():
+    for alias in settings.CACHES:
+        caches[alias].get('warmup')
+    return len(settings.CACHES)
+
+class WarmupHandler(BaseHandler):
+    """The middleware stack without WARMUP_SKIPPED_MIDDLEWARE.
+
+    Unlike the WSGI and ASGI handlers (and the test client), a BaseHandler
+    never sends request_started or request_finished.
+    """
+
+    def load_middleware(self, is_async=False):
+        from django.test.utils import override_settings
+        # BaseHandler builds the chain from settings.MIDDLEWARE
+        middleware = [path for path in settings.MIDDLEWARE if path not in WARMUP_SKIPPED_MIDDLEWARE]
+        with override_settings(MIDDLEWARE=middleware):
+            super().load_middleware(is_async)
+
+def warm_pages():
+    from django.test import RequestFactory
+    host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+    factory = RequestFactory(HTTP_HOST=host)
+    handler = WarmupHandler()
+    handler.load_middleware()
+    count = 0
+    for name in WARMUP_PAGES:
+        if handler.get_response(factory.get(reverse(name))).status_code == 200:
+            count += 1
+    return count
+
+STEPS = (
+    ('urls', warm_urls),
+    ('templates', warm_templates),
+    ('serializers', warm_serializers),
+    ('jwt', warm_jwt),
+    ('database', warm_database),
+    ('caches', warm_caches),
+    ('pages', warm_pages),
+)
+
+def warmup():
+    """Run every warm-up step; returns ``[(step, seconds, items warmed or None if it failed)]``."""
+    report = []
+    started = time.perf_counter()
+    for name, step in STEPS:
+        step_started = time.perf_counter()
+        try:
+            count = step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+            count = None
+        report.append((name, time.perf_counter() - step_started, count))
+    # Connections opened here belong to this thread; request threads open their own
+    connections.close_all()
+    logger.info("Worker %s warmed up in %.0f ms", os.getpid(), (time.perf_counter() - started) * 1000)
+    return report
+
+async def lifespan(receive, send):
+    """ASGI lifespan protocol: warm up at startup, acknowledge shutdown."""
+    from asgiref.sync import sync_to_async
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await sync_to_async(warmup, thread_sensitive=False)()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+def import_times(stderr):
+    """Parse ``python -X importtime`` output into ``[(module, self us, cumulative us, depth)]``."""
+    rows = []
+    for line in stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)', line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3))))
+    return rows
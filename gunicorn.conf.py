@@ -0,0 +1,12 @@
+# gunicorn.conf.py
+# Read by gunicorn when it is started from this directory (e.g. gunicorn foodflex.wsgi:application)
+
+# Import Django, the apps and the URLconf once in the master; workers fork from it already
+# imported instead of each paying the startup imports (see manage.py warmup --importtime)
+preload_app = True
+
+def post_worker_init(worker):
+    # Per-process state (compiled templates, resolver caches, page cache) is built before the
+    # worker takes its first request; database connections are opened after the fork
+    from foodflex.warmup import warmup
+    warmup()
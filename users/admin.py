@@ -1,8 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
+from django.utils import timezone
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
+from .models import Task
 
 class UserResource(resources.ModelResource):
     class Meta:
@@ -29,4 +31,19 @@ class CustomUserAdmin(UserAdmin, ImportExportModelAdmin):
     )
 
 admin.site.unregister(User)
-admin.site.register(User, CustomUserAdmin)
\ No newline at end of file
+admin.site.register(User, CustomUserAdmin)
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'max_attempts', 'visible_at', 'wait_ms', 'run_ms', 'created_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'last_error')
+    readonly_fields = ('started_at', 'finished_at', 'wait_ms', 'run_ms', 'locked_by', 'created_at')
+    ordering = ('-id',)
+    show_full_result_count = False
+    actions = ['retry_now']
+
+    @admin.action(description="Retry selected tasks now")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='running').update(status='queued', visible_at=timezone.now(), attempts=0, locked_by='')
+        self.message_user(request, f"{updated} tasks queued.")
@@ -6,4 +6,6 @@ class UsersConfig(AppConfig):
     name = 'users'
 
     def ready(self):
-        import users.signals  # Import the signals module
\ No newline at end of file
+        import users.signals  # Import the signals module
+        import foodflex.db  # Registers the SQLite connection tuning hook
+        import foodflex.metrics  # Registers the per-request query recorder
\ No newline at end of file
@@ -1,23 +1,25 @@
+from django.utils.functional import SimpleLazyObject
 from vendor.models import Order
 
-def cart_count(request):
-    if request.user.is_authenticated:
-        ongoing_orders = Order.objects.filter(user=request.user, status='ongoing').order_by('-created_at')
-        cart_count = 0
-        vendor_id = None
+def get_cart_summary(user_id):
+    # Read per request, not cached: a per-process cache would only ever be cleared in the worker that
+    # changed the order. A user has a handful of ongoing orders, found through the (user, status, created_at) index
+    ongoing = Order.objects.filter(user_id=user_id, status='ongoing').order_by('-created_at')
+    rows = list(ongoing.values_list('vendor_id', 'item_count'))
+    return {
+        'count': sum(item_count for _, item_count in rows),
+        'vendor_id': rows[0][0] if rows else None,
+    }
 
-        if ongoing_orders.exists():
-            most_recent_order = ongoing_orders.first()
-            vendor_id = most_recent_order.vendor.id
-            for order in ongoing_orders:
-                for item_id, details in order.order_items.items():
-                    cart_count += details.get('qty', 0)
+def cart_count(request):
+    # Nothing is queried until a template actually reads cart_count or cart_vendor_id
+    def summary():
+        if request.user.is_authenticated:
+            return get_cart_summary(request.user.id)
+        return {'count': 0, 'vendor_id': None}
 
-        return {
-            'cart_count': cart_count,
-            'cart_vendor_id': vendor_id,
-        }
+    summary = SimpleLazyObject(summary)
     return {
-        'cart_count': 0,
-        'cart_vendor_id': None,
-    }
\ No newline at end of file
+        'cart_count': SimpleLazyObject(lambda: summary['count']),
+        'cart_vendor_id': SimpleLazyObject(lambda: summary['vendor_id']),
+    }
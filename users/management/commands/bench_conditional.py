@@ -0,0 +1,84 @@
+# users/management/commands/bench_conditional.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from vendor.models import Vendor, OrderHistory
+
+class Command(BaseCommand):
+    help = "Measure full responses against 304 revalidations for the views that support conditional GET."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='Requests per view and kind.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be allowed by ALLOWED_HOSTS.')
+
+    def client_for(self, user, host):
+        client = Client(HTTP_HOST=host, HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        client.force_login(user)
+        return client
+
+    def measure(self, client, path, total, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        # The request_started signal resets connection.queries, so count at the cursor instead
+        with connection.execute_wrapper(count):
+            response = client.get(path, **headers)
+        wall, cpu = time.perf_counter(), time.process_time()
+        for _ in range(total):
+            client.get(path, **headers)
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        return {
+            'status': response.status_code,
+            'bytes': len(response.content),
+            'queries': len(queries),
+            'wall_ms': wall / total * 1000,
+            'cpu_ms': cpu / total * 1000,
+        }
+
+    def handle(self, *args, **options):
+        vendor = Vendor.objects.annotate(items=Count('menu_items')).order_by('-items').first()
+        customer_id = OrderHistory.objects.values('user').annotate(n=Count('id')).order_by('-n').values_list('user', flat=True).first()
+        if vendor is None or customer_id is None:
+            raise CommandError("Nothing to measure; seed some data first (manage.py seed_foodflex).")
+        item = vendor.menu_items.first()
+        vendor_client = self.client_for(vendor.user, options['host'])
+        customer_client = self.client_for(type(vendor.user).objects.get(pk=customer_id), options['host'])
+        views = [
+            ('api_menu_list', vendor_client, reverse('vendor:api_menu_list')),
+            ('api_menu_detail', vendor_client, reverse('vendor:api_menu_detail', args=[item.id])),
+            ('api_profile_setup', vendor_client, reverse('vendor:api_profile_setup')),
+            ('api_user', customer_client, reverse('users:api_user')),
+            ('vendor_detail', customer_client, reverse('users:vendor_detail', args=[vendor.id])),
+            ('my_orders', customer_client, reverse('users:my_orders')),
+        ]
+        total = max(1, options['requests'])
+
+        self.stdout.write(f"{'view':18} {'':4} {'status':>6} {'bytes':>8} {'queries':>7} {'wall ms':>8} {'cpu ms':>7}")
+        saved_bytes = full_bytes = 0
+        for name, client, path in views:
+            client.get(path)  # Sets the CSRF cookie, which is part of a page's ETag
+            response = client.get(path)
+            if response.status_code != 200 or not response.has_header('ETag'):
+                raise CommandError(f"{path} returned {response.status_code} without an ETag.")
+            full = self.measure(client, path, total)
+            revalidated = self.measure(client, path, total, etag=response['ETag'])
+            for kind, result in (('200', full), ('304', revalidated)):
+                self.stdout.write(
+                    f"{name if kind == '200' else '':18} {kind:4} {result['status']:>6} {result['bytes']:>8} "
+                    f"{result['queries']:>7} {result['wall_ms']:>8.2f} {result['cpu_ms']:>7.2f}"
+                )
+            self.stdout.write(
+                f"{'':18} saved {1 - revalidated['bytes'] / max(full['bytes'], 1):.0%} of the body, "
+                f"{1 - revalidated['cpu_ms'] / full['cpu_ms']:.0%} of the CPU time"
+            )
+            full_bytes += full['bytes']
+            saved_bytes += full['bytes'] - revalidated['bytes']
+        self.stdout.write(f"Revalidating all {len(views)} views saves {saved_bytes} of {full_bytes} body bytes per round.")
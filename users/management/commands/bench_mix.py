@@ -0,0 +1,291 @@
+# users/management/commands/bench_mix.py
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from vendor.models import Vendor, MenuItem, Order, OrderHistory
+from .bench_servers import server_commands, read_response, wait_for_port
+
+# (name, weight, who, method, path, body): a browse-heavy mix like production traffic. ``who`` is
+# None for anonymous pages, 'customer' or 'vendor'; 'jwt' endpoints also send a Bearer token.
+MIX = [
+    ('users:landing', 5, None, 'GET', lambda data, rng: reverse('users:landing'), None),
+    ('users:home', 5, 'customer', 'GET', lambda data, rng: reverse('users:home'), None),
+    ('users:browse_shops', 25, 'customer', 'GET', lambda data, rng: reverse('users:browse_shops'), None),
+    ('users:vendor_detail', 20, 'customer', 'GET',
+     lambda data, rng: reverse('users:vendor_detail', args=[rng.choice(data['vendor_ids'])]), None),
+    ('users:my_orders', 8, 'customer', 'GET', lambda data, rng: reverse('users:my_orders'), None),
+    ('users:api_cart', 5, 'customer jwt', 'GET', lambda data, rng: reverse('users:api_cart'), None),
+    ('users:api_cart_item', 4, 'customer jwt', 'POST',
+     lambda data, rng: reverse('users:api_cart_item', args=[rng.choice(data['item_ids'])]), {'qty': 1}),
+    ('users:api_order_history', 8, 'customer jwt', 'GET', lambda data, rng: reverse('users:api_order_history'), None),
+    ('users:api_order_detail', 5, 'customer jwt', 'GET',
+     lambda data, rng: reverse('users:api_order_detail', args=[rng.choice(data['order_ids'])]), None),
+    ('vendor:vendor_home', 5, 'vendor', 'GET', lambda data, rng: reverse('vendor:vendor_home'), None),
+    ('vendor:orders', 4, 'vendor', 'GET', lambda data, rng: reverse('vendor:orders'), None),
+    ('vendor:earnings', 2, 'vendor', 'GET', lambda data, rng: reverse('vendor:earnings'), None),
+    ('vendor:api_vendor_dashboard', 4, 'vendor jwt', 'GET', lambda data, rng: reverse('vendor:api_vendor_dashboard'), None),
+]
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    return ordered[max(0, math.ceil(len(ordered) * p) - 1)]
+
+def summarize(latencies, statuses, elapsed):
+    ordered = sorted(latencies)
+
+    def ms(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        'requests': len(ordered),
+        'errors': sum(count for status, count in statuses.items() if status == 'error' or int(status) >= 500),
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        'throughput_rps': round(len(ordered) / elapsed, 2) if elapsed else None,
+        'mean_ms': ms(sum(ordered) / len(ordered)) if ordered else None,
+        'p50_ms': ms(percentile(ordered, 0.50)),
+        'p95_ms': ms(percentile(ordered, 0.95)),
+        'p99_ms': ms(percentile(ordered, 0.99)),
+    }
+
+class Results:
+    """Latencies and status counts per endpoint, shared by every worker."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+
+    def add(self, name, status, seconds):
+        with self.lock:
+            self.latencies.setdefault(name, []).append(seconds)
+            counts = self.statuses.setdefault(name, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    def report(self, elapsed):
+        everything = [latency for latencies in self.latencies.values() for latency in latencies]
+        totals = {}
+        for counts in self.statuses.values():
+            for status, count in counts.items():
+                totals[status] = totals.get(status, 0) + count
+        return {
+            'overall': summarize(everything, totals, elapsed),
+            'endpoints': {
+                name: summarize(self.latencies[name], self.statuses[name], elapsed) for name in sorted(self.latencies)
+            },
+        }
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted mix of real endpoints in-process (Django test client) or against gunicorn/uvicorn "
+        "workers, and print p50/p95/p99 latency and throughput per endpoint as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', default='client', choices=['client', 'gunicorn', 'uvicorn'],
+                            help='client runs requests in this process; gunicorn/uvicorn start a local server.')
+        parser.add_argument('--duration', type=float, default=20.0, help='Seconds of load.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Client threads, or connections to the server.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Server worker processes.')
+        parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker.')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--host', default='localhost', help='Host header; must be allowed by ALLOWED_HOSTS.')
+        parser.add_argument('--only', default=None, help='Comma separated endpoint names to keep from the mix.')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for the request sequence.')
+        parser.add_argument('--output', default=None, help='Also write the JSON report to this file.')
+        parser.add_argument('--baseline', default=None, help='An earlier JSON report to print p95 and throughput changes against.')
+
+    def mix(self, only):
+        mix = MIX
+        if only:
+            names = set(only.split(','))
+            unknown = names - {entry[0] for entry in MIX}
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}.")
+            mix = [entry for entry in MIX if entry[0] in names]
+        return mix
+
+    def load_data(self):
+        """The accounts and ids requests are made with; run seed_foodflex first for realistic volumes."""
+        vendor = Vendor.objects.filter(menu_items__isnull=False).order_by('id').first()
+        if vendor is None:
+            raise CommandError("No vendor with a menu; run seed_foodflex first.")
+        customer_id = Order.objects.order_by('id').values_list('user_id', flat=True).first()
+        if customer_id is None:
+            customer, _ = User.objects.get_or_create(username='bench@example.com', defaults={'email': 'bench@example.com'})
+        else:
+            customer = User.objects.get(id=customer_id)
+        order_ids = list(OrderHistory.objects.filter(user=customer).values_list('id', flat=True)[:200])
+        return {
+            'vendor': vendor.user,
+            'customer': customer,
+            'vendor_ids': list(Vendor.objects.order_by('id').values_list('id', flat=True)[:1000]),
+            'item_ids': list(MenuItem.objects.filter(vendor=vendor, is_available=True).values_list('id', flat=True)[:50]),
+            'order_ids': order_ids or [0],
+        }
+
+    def credentials(self, data):
+        """Session cookie and Bearer token for each role, made once and shared by every worker."""
+        credentials = {None: ({}, None)}
+        for role in ('customer', 'vendor'):
+            client = Client()
+            client.force_login(data[role])
+            credentials[role] = (
+                {settings.SESSION_COOKIE_NAME: client.cookies[settings.SESSION_COOKIE_NAME].value},
+                f'Bearer {RefreshToken.for_user(data[role]).access_token}',
+            )
+        return credentials
+
+    def run_in_process(self, mix, data, credentials, options, results):
+        deadline = time.perf_counter() + options['duration']
+        names, weights = [entry[0] for entry in mix], [entry[1] for entry in mix]
+        by_name = {entry[0]: entry for entry in mix}
+
+        def worker(index):
+            rng = random.Random(None if options['seed'] is None else options['seed'] + index)
+            clients = {}
+            try:
+                while time.perf_counter() < deadline:
+                    name, _, who, method, path, body = by_name[rng.choices(names, weights)[0]]
+                    role = who.split()[0] if who else None
+                    if role not in clients:
+                        cookies, token = credentials[role]
+                        client = Client(HTTP_HOST=options['host'])
+                        for key, value in cookies.items():
+                            client.cookies[key] = value
+                        if who and who.endswith('jwt'):
+                            client.defaults['HTTP_AUTHORIZATION'] = token
+                        clients[role] = client
+                    client = clients[role]
+                    url = path(data, rng)
+                    started = time.perf_counter()
+                    try:
+                        if method == 'GET':
+                            status = client.get(url).status_code
+                        else:
+                            status = client.post(url, body, content_type='application/json').status_code
+                    except Exception:
+                        status = 'error'
+                    results.add(name, status, time.perf_counter() - started)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_against_server(self, mix, data, credentials, options, results):
+        names, weights = [entry[0] for entry in mix], [entry[1] for entry in mix]
+        by_name = {entry[0]: entry for entry in mix}
+
+        def raw_request(rng):
+            name, _, who, method, path, body = by_name[rng.choices(names, weights)[0]]
+            cookies, token = credentials[who.split()[0] if who else None]
+            headers = [f'{method} {path(data, rng)} HTTP/1.1', f'Host: {options["host"]}']
+            if cookies:
+                headers.append('Cookie: ' + '; '.join(f'{key}={value}' for key, value in cookies.items()))
+            if who and who.endswith('jwt'):
+                headers.append(f'Authorization: {token}')
+            payload = json.dumps(body).encode() if body is not None else b''
+            if body is not None:
+                headers += ['Content-Type: application/json', f'Content-Length: {len(payload)}']
+            return name, '\r\n'.join(headers).encode() + b'\r\n\r\n' + payload
+
+        async def connection_loop(index, deadline):
+            rng = random.Random(None if options['seed'] is None else options['seed'] + index)
+            writer = None
+            while time.perf_counter() < deadline:
+                name, request = raw_request(rng)
+                started = time.perf_counter()
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection('127.0.0.1', options['port'])
+                    writer.write(request)
+                    status = await read_response(reader)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    status = 'error'
+                    if writer is not None:
+                        writer.close()
+                    writer = None
+                results.add(name, status, time.perf_counter() - started)
+            if writer is not None:
+                writer.close()
+
+        async def drive():
+            deadline = time.perf_counter() + options['duration']
+            await asyncio.gather(*(connection_loop(index, deadline) for index in range(options['concurrency'])))
+
+        command = server_commands(options['workers'], options['threads'], options['port'])[options['server']]
+        if shutil.which(options['server']) is None:
+            raise CommandError(f"{options['server']} is not installed.")
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+        try:
+            wait_for_port(options['port'], process)
+            asyncio.run(drive())
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait()
+
+    def compare(self, report, baseline_path):
+        with open(baseline_path) as handle:
+            baseline = json.load(handle)
+        self.stderr.write(f"{'endpoint':32} {'p95 ms':>18} {'req/s':>18}")
+        for name, current in [('overall', report['overall'])] + list(report['endpoints'].items()):
+            before = baseline['overall'] if name == 'overall' else baseline.get('endpoints', {}).get(name)
+            if not before or current['p95_ms'] is None or before['p95_ms'] is None:
+                continue
+
+            def change(key):
+                if not before[key]:
+                    return f"{current[key]}"
+                return f"{before[key]}->{current[key]} ({(current[key] - before[key]) / before[key] * 100:+.0f}%)"
+
+            self.stderr.write(f"{name:32} {change('p95_ms'):>18} {change('throughput_rps'):>18}")
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError("--concurrency must be >= 1 and --duration > 0.")
+        mix = self.mix(options['only'])
+        data = self.load_data()
+        credentials = self.credentials(data)
+        results = Results()
+
+        started = time.perf_counter()
+        if options['server'] == 'client':
+            self.run_in_process(mix, data, credentials, options, results)
+        else:
+            self.run_against_server(mix, data, credentials, options, results)
+        elapsed = time.perf_counter() - started
+
+        report = {
+            'server': options['server'],
+            'workers': options['workers'] if options['server'] != 'client' else 1,
+            'concurrency': options['concurrency'],
+            'duration_s': round(elapsed, 2),
+            'mix': {entry[0]: entry[1] for entry in mix},
+            **results.report(elapsed),
+        }
+        output = json.dumps(report, indent=2)
+        self.stdout.write(output)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+        if options['baseline']:
+            self.compare(report, options['baseline'])
@@ -0,0 +1,39 @@
+# users/management/commands/bench_page_cache.py
+import time
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+class Command(BaseCommand):
+    help = "Measure anonymous requests per second on a public page with the page cache off and on."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default=None, help="Path to request (default: the landing page).")
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per run.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be allowed by ALLOWED_HOSTS.')
+
+    def run(self, label, path, total, host):
+        # Runs the full middleware stack in-process, so only server and network time are left out
+        client = Client(HTTP_HOST=host)
+        response = client.get(path)
+        if response.status_code != 200:
+            self.stderr.write(f"{path} returned {response.status_code}; is it a public page?")
+            return
+        started = time.perf_counter()
+        for _ in range(total):
+            client.get(path)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label}")
+        self.stdout.write(f"  requests:      {total} in {elapsed:.2f}s ({total / elapsed:.0f} req/s)")
+        self.stdout.write(f"  mean latency:  {elapsed / total * 1000:.2f} ms")
+        self.stdout.write(f"  X-Page-Cache:  {response.get('X-Page-Cache', '-')} on the first request")
+
+    def handle(self, *args, **options):
+        path = options['url'] or reverse('users:landing')
+        total = max(1, options['requests'])
+        cache.clear()
+        with override_settings(PAGE_CACHE_SECONDS=0):
+            self.run("before (page cache disabled)", path, total, options['host'])
+        cache.clear()
+        self.run("after (page cache enabled)", path, total, options['host'])
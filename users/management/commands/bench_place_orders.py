@@ -0,0 +1,86 @@
+# users/management/commands/bench_place_orders.py
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, DatabaseError
+from vendor.models import Vendor, MenuItem
+from users.services import place_order
+
+class Command(BaseCommand):
+    help = "Measure concurrent order placement throughput (orders/second) against the configured database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=500, help='Total number of orders to place.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Number of concurrent placing threads.')
+        parser.add_argument('--replay-ratio', type=float, default=0.1, help='Fraction of placements that resend an already used idempotency key.')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated vendor, customers and orders.')
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        concurrency = max(1, options['concurrency'])
+        total = max(1, options['orders'])
+
+        vendor_user = User.objects.create_user(username=f'bench-{run_id}-vendor', email=f'bench-{run_id}-vendor@example.com')
+        vendor = Vendor.objects.create(user=vendor_user, restaurant_name=f'Bench {run_id}', delivery=True)
+        menu_items = MenuItem.objects.bulk_create([
+            MenuItem(vendor=vendor, name=f'Item {i}', price=Decimal('5.00') + i) for i in range(20)
+        ])
+        customers = [
+            User.objects.create_user(username=f'bench-{run_id}-customer-{i}', email=f'bench-{run_id}-customer-{i}@example.com')
+            for i in range(concurrency)
+        ]
+        item_ids = [item.id for item in menu_items]
+
+        def worker(index):
+            user = customers[index]
+            latencies, errors, replays = [], 0, 0
+            used_keys = []
+            try:
+                for n in range(index, total, concurrency):
+                    if used_keys and (n % 100) < options['replay_ratio'] * 100:
+                        key = used_keys[-1]
+                    else:
+                        key = f'{run_id}-{index}-{n}'
+                        used_keys.append(key)
+                    quantities = {item_ids[(n + j) % len(item_ids)]: 1 + j for j in range(3)}
+                    started = time.perf_counter()
+                    try:
+                        order, created = place_order(
+                            user, vendor.id, quantities,
+                            address='1 Bench Street', city='Bench City', postal_code='00000',
+                            idempotency_key=key,
+                        )
+                        replays += not created
+                    except DatabaseError:
+                        errors += 1
+                    latencies.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+            return latencies, errors, replays
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(worker, range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for result in results for latency in result[0])
+        errors = sum(result[1] for result in results)
+        replays = sum(result[2] for result in results)
+        placed = len(latencies) - errors - replays
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        self.stdout.write(f"database:      {connection.vendor}")
+        self.stdout.write(f"concurrency:   {concurrency}")
+        self.stdout.write(f"placed:        {placed} new orders, {replays} idempotent replays, {errors} errors")
+        self.stdout.write(f"elapsed:       {elapsed:.2f}s")
+        self.stdout.write(f"throughput:    {placed / elapsed:.1f} orders/s")
+        self.stdout.write(f"latency (ms):  p50={statistics.median(latencies) * 1000:.1f} p95={percentile(0.95):.1f} p99={percentile(0.99):.1f}")
+
+        if not options['keep']:
+            User.objects.filter(username__startswith=f'bench-{run_id}-').delete()
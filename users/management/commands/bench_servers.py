@@ -0,0 +1,141 @@
+# users/management/commands/bench_servers.py
+import asyncio
+import os
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+def server_commands(workers, threads, port):
+    bind = f'127.0.0.1:{port}'
+    return {
+        # Sync WSGI: each request holds a worker thread while it waits on the database
+        'gunicorn': [
+            sys.executable, '-m', 'gunicorn', 'foodflex.wsgi:application', '--bind', bind,
+            '--workers', str(workers), '--worker-class', 'gthread', '--threads', str(threads),
+        ],
+        # ASGI: the async middleware runs on the event loop, the sync views in a thread
+        'uvicorn': [
+            sys.executable, '-m', 'uvicorn', 'foodflex.asgi:application', '--host', '127.0.0.1', '--port', str(port),
+            '--workers', str(workers), '--log-level', 'warning', '--no-access-log',
+        ],
+    }
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError("The server exited during startup; run its command by hand to see why.")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Nothing is listening on port {port} after {timeout}s.")
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    await reader.readexactly(length)
+    return status
+
+async def connection_loop(port, request, deadline, latencies, statuses):
+    """One keep-alive client connection issuing requests back to back until ``deadline``."""
+    writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            started = time.perf_counter()
+            writer.write(request)
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            statuses['error'] = statuses.get('error', 0) + 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+async def drive(port, request, connections, duration):
+    latencies, statuses = [], {}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(connection_loop(port, request, deadline, latencies, statuses) for _ in range(connections)))
+    return latencies, statuses
+
+class Command(BaseCommand):
+    help = "Compare gunicorn (WSGI) and uvicorn (ASGI) throughput and latency with many simultaneous connections."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=500, help='Simultaneous keep-alive connections.')
+        parser.add_argument('--duration', type=float, default=15.0, help='Seconds of load per server.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help='Server worker processes.')
+        parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker.')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--path', default=None, help='Path to load (default: browse_shops).')
+        parser.add_argument('--servers', default='gunicorn,uvicorn', help='Comma separated: gunicorn, uvicorn.')
+        parser.add_argument('--user', default=None, help='Username to send requests as, e.g. a vendor for the dashboard API.')
+
+    def credentials(self, username):
+        # Pages accept the session (via JWTMiddleware), the APIs a bearer token
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f"No user called {username!r}.")
+        else:
+            user, created = User.objects.get_or_create(username='bench@example.com', defaults={'email': 'bench@example.com'})
+        client = Client()
+        client.force_login(user)
+        return client.cookies[settings.SESSION_COOKIE_NAME].value, str(RefreshToken.for_user(user).access_token)
+
+    def handle(self, *args, **options):
+        path = options['path'] or reverse('users:browse_shops')
+        session, token = self.credentials(options['user'])
+        request = (
+            f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+            f"Cookie: {settings.SESSION_COOKIE_NAME}={session}\r\nAuthorization: Bearer {token}\r\n\r\n"
+        ).encode()
+        commands = server_commands(options['workers'], options['threads'], options['port'])
+
+        for name in options['servers'].split(','):
+            if name not in commands:
+                raise CommandError(f"Unknown server {name!r}; choose from {', '.join(commands)}.")
+            if shutil.which(name) is None:
+                self.stderr.write(f"{name} is not installed; skipping.")
+                continue
+            process = subprocess.Popen(commands[name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+            try:
+                wait_for_port(options['port'], process)
+                latencies, statuses = asyncio.run(drive(options['port'], request, options['connections'], options['duration']))
+            finally:
+                os.killpg(process.pid, signal.SIGTERM)
+                process.wait()
+
+            latencies.sort()
+            self.stdout.write(f"{name} ({options['workers']} workers, {options['connections']} connections, {path})")
+            if not latencies:
+                self.stdout.write(f"  no completed requests; statuses: {statuses}")
+                continue
+
+            def percentile(p):
+                return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+            self.stdout.write(f"  requests:      {len(latencies)} in {options['duration']:.0f}s ({len(latencies) / options['duration']:.0f} req/s)")
+            self.stdout.write(f"  latency (ms):  p50={statistics.median(latencies) * 1000:.1f} p95={percentile(0.95):.1f} p99={percentile(0.99):.1f}")
+            self.stdout.write(f"  statuses:      {dict(sorted(statuses.items(), key=str))}")
@@ -0,0 +1,104 @@
+# users/management/commands/bench_sqlite.py
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from multiprocessing import get_context
+from django.core.management.base import BaseCommand
+from foodflex.db import apply_sqlite_pragmas, sqlite_pragmas
+
+# SQLite's own defaults, as the app ran before the tuning hook existed
+BASELINE_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+SCHEMA = (
+    "CREATE TABLE session (session_key TEXT PRIMARY KEY, session_data TEXT, expire_date REAL)",
+    "CREATE TABLE orders (id INTEGER PRIMARY KEY, vendor_id INTEGER, user_id INTEGER, total REAL, created_at REAL)",
+    "CREATE INDEX orders_vendor_idx ON orders (vendor_id, created_at)",
+    "CREATE TABLE vendor (id INTEGER PRIMARY KEY, rating REAL)",
+)
+
+def run_worker(args):
+    """Run a mix of page reads, session saves and order placements; return (latencies, lock_errors)."""
+    path, pragmas, immediate, operations, seed = args
+    rng = random.Random(seed)
+    # isolation_level=None: transactions are explicit, as Django issues them in autocommit mode
+    conn = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+    apply_sqlite_pragmas(conn.cursor(), pragmas)
+    begin = 'BEGIN IMMEDIATE' if immediate else 'BEGIN'
+    latencies, lock_errors = [], 0
+    for _ in range(operations):
+        vendor_id = rng.randint(1, 50)
+        roll = rng.random()
+        started = time.perf_counter()
+        try:
+            if roll < 0.7:
+                # Vendor page: session lookup plus recent orders
+                conn.execute("SELECT session_data FROM session WHERE session_key = ?", (f'k{rng.randint(1, 500)}',)).fetchall()
+                conn.execute("SELECT * FROM orders WHERE vendor_id = ? ORDER BY created_at DESC LIMIT 20", (vendor_id,)).fetchall()
+            elif roll < 0.9:
+                # Session save at the end of a request
+                conn.execute("REPLACE INTO session VALUES (?, ?, ?)", (f'k{rng.randint(1, 500)}', 'x' * 200, time.time()))
+            else:
+                # Order placement: read then write inside one transaction
+                conn.execute(begin)
+                try:
+                    conn.execute("SELECT rating FROM vendor WHERE id = ?", (vendor_id,)).fetchall()
+                    conn.execute("INSERT INTO orders (vendor_id, user_id, total, created_at) VALUES (?, ?, ?, ?)",
+                                 (vendor_id, rng.randint(1, 1000), 42.0, time.time()))
+                    conn.execute("UPDATE vendor SET rating = rating WHERE id = ?", (vendor_id,))
+                    conn.execute("COMMIT")
+                except sqlite3.OperationalError:
+                    conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) and 'busy' not in str(e):
+                raise
+            lock_errors += 1
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+    return latencies, lock_errors
+
+class Command(BaseCommand):
+    help = "Compare SQLite lock errors and latency under concurrent mixed traffic, before and after the connection tuning in foodflex/db.py."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8, help='Concurrent worker processes.')
+        parser.add_argument('--operations', type=int, default=2000, help='Operations per process.')
+
+    def run(self, label, pragmas, immediate, processes, operations):
+        fd, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        try:
+            conn = sqlite3.connect(path, isolation_level=None)
+            apply_sqlite_pragmas(conn.cursor(), {'journal_mode': pragmas.get('journal_mode', 'DELETE')})
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.executemany("INSERT INTO vendor VALUES (?, 4.0)", [(i,) for i in range(1, 51)])
+            conn.close()
+
+            started = time.perf_counter()
+            with get_context('fork').Pool(processes) as pool:
+                results = pool.map(run_worker, [(path, pragmas, immediate, operations, seed) for seed in range(processes)])
+            elapsed = time.perf_counter() - started
+        finally:
+            for suffix in ('', '-wal', '-shm', '-journal'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+        latencies = sorted(latency for result in results for latency in result[0])
+        lock_errors = sum(result[1] for result in results)
+
+        def percentile(p):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+        self.stdout.write(f"{label}")
+        self.stdout.write(f"  operations:    {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} ops/s)")
+        self.stdout.write(f"  lock errors:   {lock_errors}")
+        self.stdout.write(f"  latency (ms):  p50={statistics.median(latencies) * 1000:.2f} p95={percentile(0.95):.2f} p99={percentile(0.99):.2f}")
+
+    def handle(self, *args, **options):
+        processes, operations = max(1, options['processes']), max(1, options['operations'])
+        self.run("before (journal_mode=DELETE, deferred transactions)", BASELINE_PRAGMAS, False, processes, operations)
+        self.run(f"after ({', '.join(f'{k}={v}' for k, v in sqlite_pragmas().items())}, BEGIN IMMEDIATE)", sqlite_pragmas(), True, processes, operations)
@@ -0,0 +1,59 @@
+# users/management/commands/profile_templates.py
+import cProfile
+import os
+import pstats
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from vendor.models import Vendor
+
+# The backend's Template.render wraps the whole page render, fragments included
+TEMPLATE_RENDER = (os.path.join('django', 'template', 'backends', 'django.py'), 'render')
+
+class Command(BaseCommand):
+    help = "Profile browse_shops and vendor_detail and report the share of response time spent rendering templates, without and with fragment caching."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per page and run.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be allowed by ALLOWED_HOSTS.')
+
+    def profile(self, label, client, paths, total):
+        for path in paths:
+            if client.get(path).status_code != 200:
+                raise CommandError(f"{path} did not return 200.")
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        for _ in range(total):
+            for path in paths:
+                client.get(path)
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        rendering = sum(
+            cumulative for (filename, _, name), (_, _, _, cumulative, _) in pstats.Stats(profiler).stats.items()
+            if filename.endswith(TEMPLATE_RENDER[0]) and name == TEMPLATE_RENDER[1]
+        )
+        per_request = elapsed / (total * len(paths)) * 1000
+        self.stdout.write(f"{label}")
+        self.stdout.write(f"  mean response:  {per_request:.2f} ms (profiled)")
+        self.stdout.write(f"  templates:      {rendering / elapsed:.0%} of response time")
+
+    def handle(self, *args, **options):
+        vendor = Vendor.objects.annotate(items=Count('menu_items')).order_by('-items').first()
+        if vendor is None:
+            raise CommandError("No vendors to profile; seed some data first.")
+        client = Client(HTTP_HOST=options['host'])
+        client.force_login(vendor.user)
+        paths = [reverse('users:browse_shops'), reverse('users:vendor_detail', args=[vendor.id])]
+        total = max(1, options['requests'])
+
+        # {% cache %} prefers a "template_fragments" cache; a dummy one renders every fragment
+        no_fragments = {**settings.CACHES, 'template_fragments': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with override_settings(CACHES=no_fragments):
+            self.profile("before (fragments rendered every time)", client, paths, total)
+        cache.clear()
+        self.profile("after (vendor card and menu fragments cached)", client, paths, total)
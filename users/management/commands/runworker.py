@@ -0,0 +1,38 @@
+# users/management/commands/runworker.py
+import signal
+from django.core.management.base import BaseCommand, CommandError
+from users.queue import Worker, prune_tasks, task_metrics
+
+class Command(BaseCommand):
+    help = "Run queued background tasks (contact messages, rating recomputes, image shrinking, rollups) on a thread or process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Tasks run at the same time.')
+        parser.add_argument('--pool', choices=('thread', 'process'), default='thread', help='Use processes for CPU-bound tasks.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when no task is due.')
+        parser.add_argument('--burst', action='store_true', help='Exit once no task is due (e.g. from cron).')
+        parser.add_argument('--prune-days', type=int, default=7, help='On start, delete succeeded tasks older than this; 0 keeps them.')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['poll_interval'] <= 0:
+            raise CommandError("--concurrency must be >= 1 and --poll-interval > 0.")
+        if options['prune_days'] > 0:
+            self.stdout.write(f"Pruned {prune_tasks(options['prune_days'])} finished tasks.")
+
+        worker = Worker(concurrency=options['concurrency'], pool=options['pool'], poll_interval=options['poll_interval'])
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping after the running tasks finish...")
+            worker.stop()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+        self.stdout.write(f"Worker {worker.worker_id} running {options['concurrency']} tasks at a time in a {options['pool']} pool.")
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(f"Processed: {processed or 'nothing'}"))
+        for name, metrics in task_metrics().items():
+            counts = ', '.join(f"{status}={count}" for status, count in metrics['counts'].items())
+            timing = ''
+            if metrics.get('avg_run_ms') is not None:
+                timing = f"; wait {metrics['avg_wait_ms']:.0f} ms, run {metrics['avg_run_ms']:.1f} ms avg / {metrics['max_run_ms']:.1f} max"
+            self.stdout.write(f"  {name}: {counts}{timing}")
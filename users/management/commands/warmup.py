@@ -0,0 +1,60 @@
+# users/management/commands/warmup.py
+import os
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from foodflex.warmup import import_times, warmup
+
+# What a worker imports before it can serve: settings and apps, the WSGI handler and the URLconf
+STARTUP_SCRIPT = (
+    "import django; django.setup(); "
+    "from django.core.wsgi import get_wsgi_application; get_wsgi_application(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+class Command(BaseCommand):
+    help = "Warm up this process (URLs, templates, serializers, JWT, caches) and report what startup costs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--importtime', action='store_true', help='Also profile a fresh worker start with python -X importtime.')
+        parser.add_argument('--top', type=int, default=25, help='Modules to list in the import report.')
+
+    def import_report(self, top):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'foodflex.settings')},
+        )
+        elapsed = time.perf_counter() - started
+        rows = import_times(result.stderr)
+        if result.returncode != 0 or not rows:
+            self.stderr.write(f"Could not profile startup:\n{result.stderr[-2000:]}")
+            return
+
+        # Top-level packages by the cumulative time of their outermost imports
+        packages = {}
+        for module, _, cumulative, depth in rows:
+            if depth == 1:
+                package = module.split('.')[0]
+                packages[package] = packages.get(package, 0) + cumulative
+        total = sum(packages.values())
+        self.stdout.write(f"\nWorker startup: {elapsed * 1000:.0f} ms wall, {total / 1000:.0f} ms importing {len(rows)} modules")
+        self.stdout.write("  by package (cumulative ms):")
+        for package, cumulative in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"    {cumulative / 1000:8.1f}  {package}")
+        self.stdout.write("  slowest modules (self ms / cumulative ms):")
+        for module, self_us, cumulative, _ in sorted(rows, key=lambda row: -row[1])[:top]:
+            self.stdout.write(f"    {self_us / 1000:8.1f} / {cumulative / 1000:8.1f}  {module}")
+
+    def handle(self, *args, **options):
+        report = warmup()
+        self.stdout.write("Warm-up (ms):")
+        for step, seconds, count in report:
+            outcome = 'failed, see log' if count is None else f'{count} warmed'
+            self.stdout.write(f"  {step:12} {seconds * 1000:8.1f}  {outcome}")
+        self.stdout.write(f"  {'total':12} {sum(seconds for _, seconds, _ in report) * 1000:8.1f}")
+        if options['importtime']:
+            self.import_report(options['top'])
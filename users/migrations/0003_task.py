@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_cart'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('kwargs', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('visible_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('timeout', models.PositiveIntegerField(default=300, help_text='Visibility timeout in seconds.')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField(default=5)),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('unique_key', models.CharField(blank=True, max_length=32)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('wait_ms', models.FloatField(blank=True, help_text='Time from enqueue to the first attempt.', null=True)),
+                ('run_ms', models.FloatField(blank=True, help_text='Duration of the last attempt.', null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'visible_at'], name='task_status_visible_idx'), models.Index(fields=['unique_key', 'status'], name='task_unique_key_idx')],
+            },
+        ),
+    ]
@@ -1,12 +1,114 @@
+from decimal import Decimal
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     phone = models.CharField(max_length=15, blank=True, null=True)
+    # users.signals saves the profile with its user, so this moves on either
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Profile of {self.user.username}"
 
+class Cart(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='cart')
+    vendor = models.ForeignKey('vendor.Vendor', on_delete=models.SET_NULL, blank=True, null=True, related_name='+')
+    updated_at = models.DateTimeField(auto_now=True)
 
+    def __str__(self):
+        return f"Cart of {self.user.username}"
+
+    def add(self, menu_item, qty=1):
+        # A cart only ever holds items from one vendor; switching vendor starts a new cart
+        reset = self.vendor_id != menu_item.vendor_id
+        if reset:
+            self.lines.all().delete()
+            self.vendor_id = menu_item.vendor_id
+            self.save(update_fields=['vendor', 'updated_at'])
+        line, created = CartLine.objects.get_or_create(cart=self, menu_item=menu_item, defaults={'qty': qty})
+        if not created:
+            CartLine.objects.filter(pk=line.pk).update(qty=models.F('qty') + qty)
+        return reset
+
+    def set_qty(self, menu_item_id, qty):
+        if qty <= 0:
+            return self.remove(menu_item_id)
+        return self.lines.filter(menu_item_id=menu_item_id).update(qty=qty) > 0
+
+    def remove(self, menu_item_id):
+        deleted, _ = self.lines.filter(menu_item_id=menu_item_id).delete()
+        return deleted > 0
+
+    def clear(self):
+        self.lines.all().delete()
+        self.vendor = None
+        self.save(update_fields=['vendor', 'updated_at'])
+
+    def order_items(self):
+        """Resolve every line against MenuItem in one query.
+
+        Returns ``(items, subtotal)`` where ``items`` has the same
+        ``{item_id: {'qty', 'name', 'price', 'total'}}`` shape that
+        ``Order.order_items`` stores. Lines whose item went unavailable are skipped.
+        """
+        items = {}
+        subtotal = Decimal('0.00')
+        lines = self.lines.filter(menu_item__is_available=True).select_related('menu_item').order_by('id')
+        for line in lines:
+            total = line.menu_item.price * line.qty
+            items[str(line.menu_item_id)] = {
+                'qty': line.qty,
+                'name': line.menu_item.name,
+                'price': float(line.menu_item.price),
+                'total': float(total),
+            }
+            subtotal += total
+        return items, subtotal
+
+class CartLine(models.Model):
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name='lines')
+    menu_item = models.ForeignKey('vendor.MenuItem', on_delete=models.CASCADE, related_name='+')
+    qty = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.qty}x {self.menu_item_id} in cart {self.cart_id}"
+
+    class Meta:
+        unique_together = ('cart', 'menu_item')
+
+class Task(models.Model):
+    """A unit of background work, run by ``manage.py runworker`` (see users/queue.py)."""
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    )
+
+    name = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    # When a queued task may run; for a running task, when its lease expires and another worker may take it
+    visible_at = models.DateTimeField(default=timezone.now)
+    timeout = models.PositiveIntegerField(default=300, help_text='Visibility timeout in seconds.')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    locked_by = models.CharField(max_length=100, blank=True)
+    unique_key = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    wait_ms = models.FloatField(blank=True, null=True, help_text='Time from enqueue to the first attempt.')
+    run_ms = models.FloatField(blank=True, null=True, help_text='Duration of the last attempt.')
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'visible_at'], name='task_status_visible_idx'),
+            models.Index(fields=['unique_key', 'status'], name='task_unique_key_idx'),
+        ]
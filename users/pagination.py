@@ -0,0 +1,35 @@
+# users/pagination.py
+import base64
+from datetime import datetime
+from django.db.models import Q
+
+def encode_cursor(created_at, pk):
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Return ``(created_at, pk)`` for a cursor, or ``None`` if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+def paginate_by_cursor(queryset, cursor=None, limit=20):
+    """Keyset pagination over ``(-created_at, -id)``.
+
+    Each page is a single indexed range scan no matter how deep the customer
+    pages, unlike OFFSET. Returns ``(rows, next_cursor)``.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        created_at, pk = position
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].pk)
+    return rows, next_cursor
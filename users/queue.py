@@ -0,0 +1,226 @@
+# users/queue.py
+"""A small durable task queue backed by the Task model.
+
+Request handlers call ``some_task.enqueue(...)`` and return immediately; the
+row is written in the caller's transaction, so a rolled-back request never
+leaves work behind. ``manage.py runworker`` claims due tasks and runs them in
+a thread or process pool.
+
+Claiming a task leases it: ``visible_at`` moves forward by the task's
+visibility timeout, and a worker that dies mid-task simply lets the lease run
+out so another worker picks the task up again. A failed attempt is retried
+with exponential backoff until ``max_attempts`` is reached. Every task keeps
+its queue wait and run time, which ``task_metrics()`` rolls up per task name.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+import django
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Avg, Count, Max
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+from .models import Task
+import logging
+
+logger = logging.getLogger(__name__)
+
+TASK_MAX_ATTEMPTS = getattr(settings, 'TASK_MAX_ATTEMPTS', 5)
+TASK_VISIBILITY_TIMEOUT = getattr(settings, 'TASK_VISIBILITY_TIMEOUT', 300)
+TASK_RETRY_BASE_SECONDS = getattr(settings, 'TASK_RETRY_BASE_SECONDS', 10)
+TASK_RETRY_MAX_SECONDS = getattr(settings, 'TASK_RETRY_MAX_SECONDS', 60 * 60)
+
+registry = {}
+
+def task(func=None, *, name=None, max_attempts=TASK_MAX_ATTEMPTS, timeout=TASK_VISIBILITY_TIMEOUT, unique=False):
+    """Register ``func`` as a task and give it an ``enqueue(**kwargs)`` method.
+
+    ``unique`` tasks are not queued again while an identical one (same name
+    and arguments) is still waiting, e.g. one rating recompute per vendor.
+    Calling the function directly still runs it inline.
+    """
+    def register(func):
+        func.task_name = name or f"{func.__module__}.{func.__name__}"
+        func.enqueue = lambda delay=None, **kwargs: enqueue(
+            func.task_name, kwargs, delay=delay, max_attempts=max_attempts, timeout=timeout, unique=unique,
+        )
+        registry[func.task_name] = func
+        return func
+    return register(func) if func is not None else register
+
+def unique_key(name, kwargs):
+    return hashlib.md5(json.dumps([name, kwargs], sort_keys=True, default=str).encode()).hexdigest()
+
+def enqueue(name, kwargs=None, *, delay=None, max_attempts=TASK_MAX_ATTEMPTS, timeout=TASK_VISIBILITY_TIMEOUT, unique=False):
+    """Queue the task called ``name`` to run with ``kwargs`` (JSON-serialisable) after ``delay`` seconds."""
+    name = getattr(name, 'task_name', name)
+    kwargs = kwargs or {}
+    key = unique_key(name, kwargs) if unique else ''
+    if unique:
+        waiting = Task.objects.filter(unique_key=key, status='queued').first()
+        if waiting is not None:
+            return waiting
+    queued = Task.objects.create(
+        name=name, kwargs=kwargs, unique_key=key, max_attempts=max_attempts, timeout=timeout,
+        visible_at=timezone.now() + timedelta(seconds=delay or 0),
+    )
+    logger.info("Queued task %s #%s", name, queued.id)
+    return queued
+
+def retry_delay(attempts):
+    """Seconds before retry number ``attempts``: doubling from the base, capped, with jitter."""
+    delay = min(TASK_RETRY_MAX_SECONDS, TASK_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+def claim(worker_id, limit, now=None):
+    """Lease up to ``limit`` due tasks to ``worker_id`` and return their ids.
+
+    Due means queued and visible, or running with an expired lease. Tasks
+    whose lease expired on their last attempt are marked failed instead.
+    """
+    now = now or timezone.now()
+    claimed = []
+    with transaction.atomic():
+        # skip_locked lets concurrent workers on PostgreSQL/MySQL pass each other; SQLite
+        # serialises the transaction instead (transaction_mode IMMEDIATE)
+        due = list(
+            Task.objects.filter(status__in=('queued', 'running'), visible_at__lte=now)
+            .order_by('visible_at', 'id').select_for_update(skip_locked=True)
+            .values('id', 'status', 'attempts', 'max_attempts', 'timeout', 'created_at')[:limit]
+        )
+        for row in due:
+            if row['status'] == 'running' and row['attempts'] >= row['max_attempts']:
+                Task.objects.filter(id=row['id']).update(
+                    status='failed', finished_at=now, last_error='Visibility timeout expired on the last attempt.',
+                )
+                logger.warning("Task #%s timed out on its last attempt", row['id'])
+                continue
+            if row['status'] == 'running':
+                logger.warning("Task #%s lease expired; running it again", row['id'])
+            fields = {
+                'status': 'running', 'locked_by': worker_id, 'attempts': row['attempts'] + 1,
+                'started_at': now, 'visible_at': now + timedelta(seconds=row['timeout']),
+            }
+            if row['attempts'] == 0:
+                fields['wait_ms'] = (now - row['created_at']).total_seconds() * 1000
+            Task.objects.filter(id=row['id']).update(**fields)
+            claimed.append(row['id'])
+    return claimed
+
+def execute(task_id, worker_id):
+    """Run a claimed task and record the outcome. Returns the task's new status."""
+    close_old_connections()
+    try:
+        queued = Task.objects.filter(id=task_id, locked_by=worker_id, status='running').first()
+        if queued is None:
+            return None
+        # Only the worker still holding this lease may record the outcome
+        lease = Task.objects.filter(id=task_id, locked_by=worker_id, attempts=queued.attempts, status='running')
+        started = time.perf_counter()
+        try:
+            if queued.name not in registry:
+                # Spawned pool processes start with an empty registry
+                autodiscover_modules('tasks')
+            func = registry.get(queued.name)
+            if func is None:
+                raise LookupError(f"No task registered as {queued.name!r}.")
+            func(**queued.kwargs)
+        except Exception:
+            run_ms = (time.perf_counter() - started) * 1000
+            error = traceback.format_exc()
+            if queued.attempts >= queued.max_attempts:
+                lease.update(status='failed', finished_at=timezone.now(), run_ms=run_ms, last_error=error)
+                logger.error("Task %s #%s failed after %s attempts", queued.name, task_id, queued.attempts)
+                return 'failed'
+            delay = retry_delay(queued.attempts)
+            lease.update(
+                status='queued', locked_by='', run_ms=run_ms, last_error=error,
+                visible_at=timezone.now() + timedelta(seconds=delay),
+            )
+            logger.warning("Task %s #%s failed (attempt %s); retrying in %.0fs", queued.name, task_id, queued.attempts, delay)
+            return 'queued'
+        run_ms = (time.perf_counter() - started) * 1000
+        lease.update(status='succeeded', finished_at=timezone.now(), run_ms=run_ms, last_error='')
+        logger.info("Task %s #%s succeeded in %.1f ms", queued.name, task_id, run_ms)
+        return 'succeeded'
+    finally:
+        close_old_connections()
+
+def task_metrics():
+    """Per task name: how many tasks are in each status, and their wait and run times in ms."""
+    metrics = {}
+    rows = Task.objects.values('name', 'status').annotate(
+        count=Count('id'), avg_wait_ms=Avg('wait_ms'), avg_run_ms=Avg('run_ms'), max_run_ms=Max('run_ms'),
+    ).order_by('name', 'status')
+    for row in rows:
+        entry = metrics.setdefault(row['name'], {'counts': {status: 0 for status, _ in Task.STATUS_CHOICES}})
+        entry['counts'][row['status']] = row['count']
+        if row['status'] == 'succeeded':
+            entry.update(avg_wait_ms=row['avg_wait_ms'], avg_run_ms=row['avg_run_ms'], max_run_ms=row['max_run_ms'])
+    retried = Task.objects.filter(attempts__gt=1).values('name').annotate(count=Count('id'))
+    for row in retried:
+        metrics[row['name']]['retried'] = row['count']
+    return metrics
+
+def prune_tasks(days):
+    """Delete succeeded tasks finished more than ``days`` days ago. Failed ones are kept for inspection."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Task.objects.filter(status='succeeded', finished_at__lt=cutoff).delete()
+    return deleted
+
+class Worker:
+    """Claim due tasks and run them on a pool of ``concurrency`` threads or processes."""
+
+    def __init__(self, concurrency=4, pool='thread', poll_interval=1.0, worker_id=None):
+        self.concurrency = concurrency
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+        self.processed = {}
+
+    def executor(self):
+        if self.pool == 'process':
+            # Spawned rather than forked, so no process inherits an open database connection
+            connections.close_all()
+            return ProcessPoolExecutor(
+                self.concurrency, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup,
+            )
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix='runworker')
+
+    def stop(self):
+        self.stopping.set()
+
+    def run(self, burst=False):
+        """Process tasks until stopped, or with ``burst`` until nothing is due. Returns counts by outcome."""
+        autodiscover_modules('tasks')
+        running = set()
+        with self.executor() as pool:
+            while not self.stopping.is_set():
+                free = self.concurrency - len(running)
+                task_ids = claim(self.worker_id, free) if free else []
+                running.update(pool.submit(execute, task_id, self.worker_id) for task_id in task_ids)
+                if not running:
+                    if burst:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                done, running = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                self.record(done)
+            # Let in-flight tasks finish; their leases would otherwise have to expire first
+            self.record(wait(running).done)
+        return self.processed
+
+    def record(self, futures):
+        for future in futures:
+            outcome = future.result()
+            self.processed[outcome] = self.processed.get(outcome, 0) + 1
@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 import re
+from foodflex.log import payload
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,7 +21,7 @@ class UserSignupSerializer(serializers.ModelSerializer):
         fields = ['first_name', 'last_name', 'email', 'password', 'confirm_password']
 
     def validate(self, data):
-        logger.info("Validating user signup data: %s", data)
+        logger.info("Validating user signup data: %s", payload(data))
         password = data.get('password')
         if not re.match(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$', password):
             raise serializers.ValidationError({
@@ -37,7 +38,7 @@ class UserSignupSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        logger.info("Creating user with data: %s", validated_data)
+        logger.info("Creating user with data: %s", payload(validated_data))
         validated_data.pop('confirm_password')
         user = User.objects.create_user(
             username=validated_data['email'],
@@ -53,7 +54,7 @@ class UserLoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True, style={'input_type': 'password'})
 
     def validate(self, data):
-        logger.info("Validating user login data: %s", dict(data))
+        logger.info("Validating user login data: %s", payload(data))
         email = data.get('email')
         password = data.get('password')
         if not email or not password:
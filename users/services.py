@@ -0,0 +1,92 @@
+# users/services.py
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from vendor.models import Vendor, MenuItem, Order, OrderArchive
+from .models import Cart, CartLine
+import logging
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_FEE = Decimal('10.00')
+
+class OrderPlacementError(Exception):
+    pass
+
+def resolve_order_items(vendor, quantities):
+    """Price ``{menu_item_id: qty}`` against the vendor's menu in one query.
+
+    Returns ``(order_items, subtotal)`` in the shape stored on ``Order.order_items``.
+    """
+    wanted = {}
+    for item_id, qty in quantities.items():
+        try:
+            item_id, qty = int(item_id), int(qty)
+        except (TypeError, ValueError):
+            raise OrderPlacementError(f"Invalid item or quantity: {item_id}")
+        if qty > 0:
+            wanted[item_id] = qty
+    if not wanted:
+        raise OrderPlacementError("Order has no items.")
+
+    menu_items = MenuItem.objects.filter(vendor=vendor, id__in=wanted, is_available=True).only('id', 'name', 'price')
+    order_items = {}
+    subtotal = Decimal('0.00')
+    for item in menu_items:
+        qty = wanted[item.id]
+        total = item.price * qty
+        order_items[str(item.id)] = {
+            'qty': qty,
+            'name': item.name,
+            'price': float(item.price),
+            'total': float(total),
+        }
+        subtotal += total
+    missing = set(wanted) - {int(item_id) for item_id in order_items}
+    if missing:
+        raise OrderPlacementError(f"Items not available: {sorted(missing)}")
+    return order_items, subtotal
+
+def place_order(user, vendor_id, quantities, address, city, postal_code, idempotency_key=None, clear_cart=False):
+    """Create an order in one transaction, or return the one already placed with ``idempotency_key``.
+
+    Returns ``(order, created)``. Replaying a key never creates a second order,
+    even when two requests with the same key race each other. A key whose
+    order has since been archived returns the ``OrderArchive`` row.
+    """
+    if idempotency_key:
+        # Order first: archive_orders copies and deletes in one transaction, so an order
+        # missing here is already in the archive
+        for model in (Order, OrderArchive):
+            existing = model.objects.filter(user=user, idempotency_key=idempotency_key).select_related('vendor').first()
+            if existing:
+                return existing, False
+
+    vendor = Vendor.objects.filter(pk=vendor_id).first() if vendor_id else None
+    if vendor is None:
+        raise OrderPlacementError("Vendor not found.")
+    order_items, subtotal = resolve_order_items(vendor, quantities)
+    delivery_fee = DELIVERY_FEE if subtotal > 0 and vendor.delivery else Decimal('0.00')
+
+    try:
+        with transaction.atomic():
+            order = Order.objects.create(
+                vendor=vendor,
+                user=user,
+                user_address=address,
+                user_city=city,
+                user_postal_code=postal_code,
+                order_items=order_items,
+                total_amount=subtotal + delivery_fee,
+                status='ongoing',
+                idempotency_key=idempotency_key or None,
+            )
+            if clear_cart:
+                CartLine.objects.filter(cart__user=user).delete()
+                Cart.objects.filter(user=user).update(vendor=None)
+    except IntegrityError:
+        if not idempotency_key:
+            raise
+        # Lost a race with a concurrent request carrying the same key
+        logger.info("Replayed order placement for user %s with key %s", user.pk, idempotency_key)
+        return Order.objects.select_related('vendor').get(user=user, idempotency_key=idempotency_key), False
+    return order, True
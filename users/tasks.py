@@ -0,0 +1,19 @@
+# users/tasks.py
+from django.conf import settings
+from django.core.mail import EmailMessage
+from .queue import task
+import logging
+
+logger = logging.getLogger(__name__)
+
+@task(max_attempts=8)
+def send_contact_message(name, subject, email, message):
+    """Forward a help-page contact message to the support inbox."""
+    EmailMessage(
+        subject=f"[Contact] {subject or 'No subject'}",
+        body=f"From: {name} <{email}>\n\n{message}",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[settings.CONTACT_EMAIL],
+        reply_to=[email] if email else None,
+    ).send()
+    logger.info("Contact message from %s forwarded to %s", email, settings.CONTACT_EMAIL)
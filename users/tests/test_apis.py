@@ -3,6 +3,8 @@ from django.urls import reverse
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.test import APIClient
+from vendor.tests.factories import VendorFactory, MenuItemFactory, OrderFactory
+from vendor.models import Order
 import logging
 
 logger = logging.getLogger(__name__)
@@ -97,4 +99,129 @@ class UserSessionAPIViewTest(TestCase):
     def test_session_unauthenticated(self):
         logger.info("Testing UserSessionAPIView with unauthenticated user")
         response = self.client.get(self.session_url)
-        self.assertEqual(response.status_code, 401)  # Updated to match the API view
\ No newline at end of file
+        self.assertEqual(response.status_code, 401)  # Updated to match the API view
+class CartAPIViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='bansarishah258+cart@gmail.com',
+            email='bansarishah258+cart@gmail.com',
+            password='B@ns@ri258'
+        )
+        token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        self.vendor = VendorFactory()
+        self.item = MenuItemFactory(vendor=self.vendor, price=12.50)
+        self.other_item = MenuItemFactory(vendor=self.vendor, price=4.00)
+
+    def item_url(self, item):
+        return reverse('users:api_cart_item', args=[item.id])
+
+    def test_add_set_and_remove_items(self):
+        logger.info("Testing incremental cart updates with server-side prices")
+        self.client.post(self.item_url(self.item), {'qty': 2}, format='json')
+        response = self.client.post(self.item_url(self.other_item), {}, format='json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(data['vendor_id'], self.vendor.id)
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['subtotal'], 29.0)
+
+        response = self.client.put(self.item_url(self.item), {'qty': 1}, format='json')
+        self.assertEqual(response.json()['data']['items'][str(self.item.id)]['total'], 12.5)
+
+        response = self.client.delete(self.item_url(self.other_item))
+        self.assertEqual(list(response.json()['data']['items']), [str(self.item.id)])
+
+    def test_adding_from_another_vendor_resets_cart(self):
+        logger.info("Testing cart is restarted when switching vendor")
+        self.client.post(self.item_url(self.item), {}, format='json')
+        foreign_item = MenuItemFactory(price=3.00)
+        response = self.client.post(self.item_url(foreign_item), {}, format='json')
+        self.assertTrue(response.json()['cart_reset'])
+        self.assertEqual(response.json()['data']['vendor_id'], foreign_item.vendor_id)
+        self.assertEqual(response.json()['data']['count'], 1)
+
+    def test_invalid_qty(self):
+        logger.info("Testing cart rejects invalid quantities")
+        response = self.client.post(self.item_url(self.item), {'qty': 'two'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+
+class OrderPlaceAPIViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('users:api_order_place')
+        self.user = User.objects.create_user(
+            username='bansarishah258+orders@gmail.com',
+            email='bansarishah258+orders@gmail.com',
+            password='B@ns@ri258'
+        )
+        token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        self.vendor = VendorFactory(delivery=False)
+        self.item = MenuItemFactory(vendor=self.vendor, price=8.00)
+        self.payload = {
+            'vendor_id': self.vendor.id,
+            'items': {str(self.item.id): 2},
+            'address': '1 Test Street',
+            'city': 'Test City',
+            'postal_code': '12345',
+        }
+
+    def test_place_order_is_idempotent(self):
+        logger.info("Testing OrderPlaceAPIView replays on a repeated Idempotency-Key")
+        response = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['data']['total_amount'], 16.0)
+        replay = self.client.post(self.url, self.payload, format='json', HTTP_IDEMPOTENCY_KEY='key-1')
+        self.assertEqual(replay.status_code, 200)
+        self.assertEqual(replay.json()['data']['id'], response.json()['data']['id'])
+
+    def test_place_order_rejects_non_string_key(self):
+        logger.info("Testing OrderPlaceAPIView rejects an idempotency key that is not a string")
+        response = self.client.post(self.url, {**self.payload, 'idempotency_key': 123}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_place_order_missing_fields(self):
+        logger.info("Testing OrderPlaceAPIView validation")
+        response = self.client.post(self.url, {'vendor_id': self.vendor.id, 'items': {str(self.item.id): 1}}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('address', response.json()['errors'])
+
+class OrderHistoryAPIViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('users:api_order_history')
+        self.user = User.objects.create_user(
+            username='bansarishah258+history@gmail.com',
+            email='bansarishah258+history@gmail.com',
+            password='B@ns@ri258'
+        )
+        token = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        vendor = VendorFactory()
+        self.orders = [
+            OrderFactory(user=self.user, vendor=vendor, status='completed', order_items={'1': {'qty': 2, 'total': 10.0}})
+            for _ in range(5)
+        ]
+        OrderFactory(user=self.user, vendor=vendor, status='ongoing')
+
+    def test_cursor_pagination(self):
+        logger.info("Testing order history pages with a cursor")
+        first = self.client.get(self.url, {'status': 'past', 'limit': 3}).json()
+        self.assertEqual(len(first['data']), 3)
+        self.assertEqual(first['data'][0]['item_count'], 2)
+        self.assertIsNotNone(first['next_cursor'])
+        second = self.client.get(self.url, {'status': 'past', 'limit': 3, 'cursor': first['next_cursor']}).json()
+        self.assertEqual(len(second['data']), 2)
+        self.assertIsNone(second['next_cursor'])
+        seen = [order['id'] for order in first['data'] + second['data']]
+        self.assertEqual(sorted(seen), sorted(order.id for order in self.orders))
+
+    def test_order_detail_includes_items(self):
+        logger.info("Testing order detail API returns the line items")
+        response = self.client.get(reverse('users:api_order_detail', args=[self.orders[0].id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['items'], {'1': {'qty': 2, 'total': 10.0}})
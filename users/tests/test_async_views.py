@@ -0,0 +1,61 @@
+from django.test import AsyncClient, TestCase
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from vendor.tests.factories import UserFactory, VendorFactory, MenuItemFactory, OrderFactory, ReviewFactory
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AsyncReadPathTest(TestCase):
+    """Drive the read views through the ASGI handler, with every middleware in async mode."""
+
+    def setUp(self):
+        self.vendor = VendorFactory(rating=8.0)
+        self.item = MenuItemFactory(vendor=self.vendor)
+        self.customer = UserFactory()
+        ReviewFactory(vendor=self.vendor, user=self.customer, overall_rating=4.0)
+        OrderFactory(vendor=self.vendor, user=self.customer, status='completed', total_amount=30)
+        # Issuing a token records it in the database, which async tests cannot do directly
+        self.customer_token = str(RefreshToken.for_user(self.customer).access_token)
+        self.vendor_token = str(RefreshToken.for_user(self.vendor.user).access_token)
+        self.client = AsyncClient()
+
+    async def test_browse_shops(self):
+        logger.info("Testing browse_shops under ASGI with a session user")
+        await self.client.aforce_login(self.customer)
+        response = await self.client.get(reverse('users:browse_shops'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([vendor.id for vendor in response.context['vendors']], [self.vendor.id])
+        self.assertEqual(response.context['vendor_count'], 1)
+        self.assertEqual(response.context['rating_counts'], {'9': 0, '8': 1, '7': 1, '6': 1})
+
+    async def test_vendor_detail_with_jwt_cookie(self):
+        logger.info("Testing vendor_detail under ASGI authenticated by the JWT cookie")
+        self.client.cookies['access_token'] = self.customer_token
+        response = await self.client.get(reverse('users:vendor_detail', args=[self.vendor.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['score'], 8.0)
+        self.assertEqual(response.context['review_count'], 1)
+        self.assertIn(self.item, response.context['menu_items_by_section'][self.item.category])
+
+    async def test_unauthenticated_redirects(self):
+        logger.info("Testing async JWTMiddleware redirects anonymous requests")
+        response = await self.client.get(reverse('users:browse_shops'))
+        self.assertRedirects(response, reverse('users:landing'), fetch_redirect_response=False)
+
+    async def test_vendor_dashboard_api(self):
+        logger.info("Testing VendorDashboardAPIView under ASGI")
+        response = await self.client.get(
+            reverse('vendor:api_vendor_dashboard'), headers={'Authorization': f'Bearer {self.vendor_token}'}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(data['total_earnings'], 30.0)
+        self.assertEqual(data['total_customers'], 1)
+        self.assertEqual(data['average_rating'], 4.0)
+        self.assertEqual(len(data['chart_data']), len(data['chart_labels']))
+
+        response = await self.client.get(
+            reverse('vendor:api_vendor_dashboard'), headers={'Authorization': f'Bearer {self.customer_token}'}
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,137 @@
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import Cart
+from vendor.tests.factories import UserFactory, VendorFactory, MenuItemFactory, OrderFactory, ReviewFactory
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = VendorFactory(profile_image=None)
+        self.item = MenuItemFactory(vendor=self.vendor, image=None)
+        self.customer = UserFactory()
+        self.client = APIClient()
+
+    def as_user(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        self.client.force_login(user)
+
+    def revalidate(self, url):
+        """GET ``url``, then again with its ETag; returns both responses."""
+        # A first visit to a page is also given its CSRF cookie, which is part of the ETag
+        self.client.get(url)
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        second.queries = len(queries)
+        return first, second
+
+    def test_menu_list_not_modified_until_menu_changes(self):
+        logger.info("Testing MenuItemListAPIView answers 304 until an item is edited, added or removed")
+        self.as_user(self.vendor.user)
+        url = reverse('vendor:api_menu_list')
+        first, second = self.revalidate(url)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.content, b'')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertIn('private', first['Cache-Control'])
+        self.assertIn('Authorization', first['Vary'])
+
+        etag = first['ETag']
+        other = MenuItemFactory(vendor=self.vendor, image=None)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), 2)
+
+        etag = response['ETag']
+        other.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_menu_detail_sends_last_modified(self):
+        logger.info("Testing MenuItemDetailAPIView validates by the item's updated_at")
+        self.as_user(self.vendor.user)
+        url = reverse('vendor:api_menu_detail', args=[self.item.id])
+        first, second = self.revalidate(url)
+        self.assertEqual(second.status_code, 304)
+        self.assertIn('Last-Modified', first)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+        self.item.name = 'Renamed'
+        self.item.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.json()['data']['name'], 'Renamed')
+        # Another vendor's item is still a plain 404
+        self.as_user(VendorFactory().user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 404)
+
+    def test_etag_is_per_user(self):
+        logger.info("Testing one user's ETag never matches another user's response")
+        self.as_user(self.vendor.user)
+        etag = self.client.get(reverse('vendor:api_profile_setup'))['ETag']
+        self.as_user(VendorFactory().user)
+        self.assertEqual(self.client.get(reverse('vendor:api_profile_setup'), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_user_profile_follows_profile_saves(self):
+        logger.info("Testing UserProfileAPIView is versioned by the profile's updated_at, not a cached counter")
+        self.as_user(self.customer)
+        url = reverse('users:api_user')
+        first, second = self.revalidate(url)
+        self.assertEqual(second.status_code, 304)
+        self.customer.profile.phone = '5550100'
+        self.customer.profile.save()
+        # Another worker's cache never saw the save
+        cache.clear()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['phone'], '5550100')
+
+        self.customer.first_name = 'Renamed'
+        self.customer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['first_name'], 'Renamed')
+
+    def test_vendor_detail(self):
+        logger.info("Testing vendor_detail answers 304 until the menu, reviews or the user's cart change")
+        self.as_user(self.customer)
+        url = reverse('users:vendor_detail', args=[self.vendor.id])
+        first, second = self.revalidate(url)
+        self.assertEqual(second.status_code, 304)
+        self.assertLess(second.queries, 6)
+
+        etag = first['ETag']
+        Cart.objects.create(user=self.customer).add(self.item, 2)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        ReviewFactory(vendor=self.vendor, user=UserFactory())
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_my_orders(self):
+        logger.info("Testing my_orders answers 304 until one of the user's orders changes")
+        self.as_user(self.customer)
+        order = OrderFactory(vendor=self.vendor, user=self.customer, status='ongoing', order_items={
+            str(self.item.id): {'qty': 1, 'name': self.item.name, 'price': float(self.item.price), 'total': float(self.item.price)},
+        })
+        url = reverse('users:my_orders')
+        # The page's "Updated at" minute is part of its version
+        clock = mock.patch('users.views.timezone', now=mock.Mock(return_value=timezone.now()))
+        clock.start()
+        self.addCleanup(clock.stop)
+        first, second = self.revalidate(url)
+        self.assertEqual(second.status_code, 304)
+        order.status = 'completed'
+        order.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
@@ -0,0 +1,39 @@
+from django.test import TestCase, RequestFactory
+from django.contrib.auth.models import AnonymousUser
+from users.context_processors import cart_count
+from vendor.tests.factories import UserFactory, VendorFactory, OrderFactory
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CartCountContextProcessorTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.vendor = VendorFactory()
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+
+    def test_lazy_until_read(self):
+        logger.info("Testing cart_count does not query until a value is read")
+        OrderFactory(user=self.user, vendor=self.vendor, order_items={'1': {'qty': 2, 'total': 20.0}})
+        with self.assertNumQueries(0):
+            context = cart_count(self.request)
+        with self.assertNumQueries(1):
+            self.assertEqual(str(context['cart_count']), '2')
+            self.assertEqual(context['cart_vendor_id'], self.vendor.id)
+
+    def test_follows_order_changes(self):
+        logger.info("Testing cart_count reflects an order change on the next request")
+        order = OrderFactory(user=self.user, vendor=self.vendor, order_items={'1': {'qty': 2, 'total': 20.0}, '2': {'qty': 1, 'total': 5.0}})
+        self.assertEqual(cart_count(self.request)['cart_count'], 3)
+        order.status = 'completed'
+        order.save()
+        self.assertEqual(cart_count(self.request)['cart_count'], 0)
+        self.assertFalse(cart_count(self.request)['cart_vendor_id'])
+
+    def test_anonymous_user(self):
+        logger.info("Testing cart_count for anonymous user")
+        self.request.user = AnonymousUser()
+        context = cart_count(self.request)
+        self.assertEqual(context['cart_count'], 0)
+        self.assertFalse(context['cart_vendor_id'])
@@ -0,0 +1,35 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from foodflex.db import apply_sqlite_pragmas, sqlite_pragmas
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SQLiteTuningTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        logger.info("Testing connection_created applies the SQLite pragmas")
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+
+    @override_settings(SQLITE_PRAGMAS={'mmap_size': None, 'cache_size': -2000})
+    def test_settings_override_defaults(self):
+        logger.info("Testing SQLITE_PRAGMAS overrides and disables defaults")
+        pragmas = sqlite_pragmas()
+        self.assertNotIn('mmap_size', pragmas)
+        self.assertEqual(pragmas['cache_size'], -2000)
+        self.assertEqual(pragmas['journal_mode'], 'WAL')
+
+    def test_invalid_pragma_rejected(self):
+        logger.info("Testing pragma names and values are validated")
+        with connection.cursor() as cursor:
+            with self.assertRaises(ValueError):
+                apply_sqlite_pragmas(cursor, {'cache_size; DROP TABLE x': 1})
+            with self.assertRaises(ValueError):
+                apply_sqlite_pragmas(cursor, {'journal_mode': 'WAL; DROP TABLE x'})
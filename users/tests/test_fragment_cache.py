@@ -0,0 +1,40 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from vendor.models import MenuItemPairing
+from vendor.tests.factories import UserFactory, VendorFactory, MenuItemFactory
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.vendor = VendorFactory(restaurant_name='Old Name')
+        self.item = MenuItemFactory(vendor=self.vendor, name='Plain Dosa')
+        self.client.force_login(UserFactory())
+
+    def test_vendor_card_refreshes_when_vendor_changes(self):
+        logger.info("Testing vendor card fragments are keyed on the vendor's updated_at")
+        self.assertContains(self.client.get(reverse('users:browse_shops')), 'Old Name')
+        self.vendor.restaurant_name = 'New Name'
+        self.vendor.save()
+        response = self.client.get(reverse('users:browse_shops'))
+        self.assertContains(response, 'New Name')
+        self.assertNotContains(response, 'Old Name')
+
+    def test_menu_sections_refresh_when_menu_changes(self):
+        logger.info("Testing menu section fragments are keyed on the menu version")
+        url = reverse('users:vendor_detail', args=[self.vendor.id])
+        first = self.client.get(url).context['menu_version']
+        self.assertEqual(self.client.get(url).context['menu_version'], first)
+
+        self.item.name = 'Masala Dosa'
+        self.item.save()
+        response = self.client.get(url)
+        self.assertNotEqual(response.context['menu_version'], first)
+        self.assertContains(response, '<h3>Masala Dosa</h3>', html=True)
+
+        paired = MenuItemFactory(vendor=self.vendor, name='Filter Coffee')
+        MenuItemPairing.objects.create(vendor=self.vendor, item=self.item, paired_item=paired, count=3, rank=0)
+        self.assertContains(self.client.get(url), 'Goes well with: Filter Coffee')
@@ -0,0 +1,91 @@
+import io
+import json
+import logging
+import time
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import QueryDict
+from django.test import SimpleTestCase
+from foodflex.log import BackgroundHandler, JSONFormatter, RateLimitFilter, SamplingFilter, payload
+
+logger = logging.getLogger(__name__)
+
+def make_record(name='vendor.views', level=logging.INFO, msg='Fetching dashboard data for user: %s', args=('a@b.c',)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+class PayloadTest(SimpleTestCase):
+    def test_redacts_secrets_and_files(self):
+        logger.info("Testing payload() hides passwords, tokens and file contents")
+        data = QueryDict(mutable=True)
+        data.update({'vendor_email': 'v@example.com', 'password_register': 'B@ns@ri258', 'refresh_token': 'abc'})
+        data['fssai_document'] = SimpleUploadedFile('fssai.pdf', b'x' * 5000)
+        text = str(payload(data))
+        self.assertIn('v@example.com', text)
+        self.assertNotIn('B@ns@ri258', text)
+        self.assertNotIn('abc', text)
+        self.assertIn('<file fssai.pdf 5000 bytes>', text)
+
+    def test_size_is_bounded(self):
+        logger.info("Testing payload() output does not grow with the request")
+        small = str(payload({'name': 'x'}))
+        large = str(payload({f'menu_items[{i}][name]': 'y' * 10000 for i in range(500)}))
+        self.assertLess(len(small), 50)
+        self.assertLessEqual(len(large), 520)
+        self.assertIn('more keys', str(payload({str(i): i for i in range(25)})))
+
+class FilterTest(SimpleTestCase):
+    def test_sampling_uses_the_closest_logger_and_keeps_warnings(self):
+        logger.info("Testing SamplingFilter rates by logger prefix")
+        sampler = SamplingFilter({'vendor': 0.0, 'vendor.tasks': 1.0})
+        self.assertFalse(sampler.filter(make_record('vendor.views')))
+        self.assertTrue(sampler.filter(make_record('vendor.tasks')))
+        self.assertTrue(sampler.filter(make_record('users.views')))
+        self.assertTrue(sampler.filter(make_record('vendor.views', logging.WARNING)))
+
+    def test_rate_limit_counts_what_it_dropped(self):
+        logger.info("Testing RateLimitFilter lets a burst through and reports the rest")
+        limiter = RateLimitFilter(burst=3, period=60)
+        with mock.patch('foodflex.log.time.monotonic', return_value=100.0):
+            allowed = [limiter.filter(make_record(args=(i,))) for i in range(10)]
+            self.assertTrue(limiter.filter(make_record(msg='Another message')))
+            self.assertTrue(limiter.filter(make_record(level=logging.ERROR)))
+            self.assertTrue(all(limiter.filter(make_record(level=logging.WARNING)) for _ in range(10)))
+        self.assertEqual(allowed, [True] * 3 + [False] * 7)
+        with mock.patch('foodflex.log.time.monotonic', return_value=161.0):
+            record = make_record()
+            self.assertTrue(limiter.filter(record))
+        self.assertEqual(record.suppressed, 7)
+
+class BackgroundHandlerTest(SimpleTestCase):
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.handler = BackgroundHandler(stream=self.stream, queue_size=5)
+        self.handler.setFormatter(JSONFormatter())
+        self.addCleanup(self.handler.close)
+
+    def test_writes_json_lines(self):
+        logger.info("Testing records are written as JSON by the background listener")
+        record = make_record()
+        record.order_id = 42
+        self.handler.handle(record)
+        self.handler.flush()
+        entry = json.loads(self.stream.getvalue())
+        self.assertEqual(entry['message'], 'Fetching dashboard data for user: a@b.c')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['logger'], 'vendor.views')
+        self.assertEqual(entry['order_id'], 42)
+
+    def test_drops_instead_of_blocking_when_full(self):
+        logger.info("Testing a full queue drops records and says how many")
+        self.handler.stop()  # Nothing drains the queue
+        started = time.perf_counter()
+        for i in range(8):
+            self.handler.handle(make_record(args=(i,)))
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(self.handler.dropped, 3)
+        self.handler.start()
+        self.handler.handle(make_record(args=('late',)))
+        self.handler.flush()
+        messages = [json.loads(line)['message'] for line in self.stream.getvalue().splitlines()]
+        self.assertIn('Log queue was full; dropped 3 records', messages)
+        self.assertEqual(messages[-1], 'Fetching dashboard data for user: late')
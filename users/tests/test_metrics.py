@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from foodflex.metrics import flush, registry
+from vendor.tests.factories import UserFactory, VendorFactory
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        registry.clear()
+        cache.clear()
+        self.staff = UserFactory(is_staff=True)
+
+    def scrape(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_staff_only(self):
+        logger.info("Testing /metrics is limited to staff")
+        self.client.force_login(UserFactory())
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+    def test_records_latency_queries_and_templates_per_view(self):
+        logger.info("Testing request latency, query and template metrics")
+        VendorFactory()
+        self.client.force_login(UserFactory())
+        self.client.get(reverse('users:browse_shops'))
+        body = self.scrape()
+        self.assertIn('foodflex_http_requests_total{method="GET",status="200",view="users:browse_shops"} 1', body)
+        self.assertIn('foodflex_http_request_duration_seconds_count{view="users:browse_shops"} 1', body)
+        self.assertIn('foodflex_http_request_duration_seconds_bucket{view="users:browse_shops",le="+Inf"} 1', body)
+        self.assertIn('foodflex_template_render_duration_seconds_count{template="users/browseshop.html"} 1', body)
+        # Every query the view issued is attributed to it
+        queries = next(line for line in body.splitlines() if line.startswith('foodflex_db_queries_per_request_sum{view="users:browse_shops"}'))
+        self.assertGreater(float(queries.split()[-1]), 3)
+        self.assertIn('foodflex_tasks', body)
+
+    @override_settings(PAGE_CACHE_SECONDS=600)
+    def test_cache_hits_and_misses(self):
+        logger.info("Testing cache hit and miss counters")
+        self.client.get(reverse('users:landing'))
+        self.client.get(reverse('users:landing'))
+        body = self.scrape()
+        self.assertIn('foodflex_cache_requests_total{family="pagecache",result="hit"} 1', body)
+        self.assertIn('foodflex_cache_requests_total{family="pagecache",result="miss"} 1', body)
+
+    @override_settings(SLOW_REQUEST_MS=0.001)
+    def test_slow_request_log_includes_sql(self):
+        logger.info("Testing slow requests are logged with their SQL")
+        self.client.force_login(UserFactory())
+        with self.assertLogs('foodflex.slow_requests', 'WARNING') as logs:
+            self.client.get(reverse('users:my_orders'))
+        self.assertIn('users:my_orders', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+    def test_combines_worker_processes(self):
+        logger.info("Testing METRICS_DIR sums the numbers of every worker process")
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            other = {
+                'counters': [['foodflex_http_slow_requests_total', [['view', 'users:help']], 2]],
+                'histograms': [],
+            }
+            with open(os.path.join(directory, '1.json'), 'w') as handle:
+                json.dump(other, handle)
+            registry.inc('foodflex_http_slow_requests_total', view='users:help')
+            flush(force=True)
+            self.assertTrue(os.path.exists(os.path.join(directory, f'{os.getpid()}.json')))
+            self.assertIn('foodflex_http_slow_requests_total{view="users:help"} 3', self.scrape())
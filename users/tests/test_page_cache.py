@@ -0,0 +1,60 @@
+import re
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from vendor.tests.factories import UserFactory
+import logging
+
+logger = logging.getLogger(__name__)
+
+def csrf_input(response):
+    return re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+
+@override_settings(PAGE_CACHE_SECONDS=600)
+class AnonymousPageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_second_request_is_served_from_cache(self):
+        logger.info("Testing public pages are cached for anonymous visitors")
+        first = self.client.get(reverse('users:landing'))
+        second = self.client.get(reverse('users:landing'))
+        self.assertEqual(first['X-Page-Cache'], 'MISS')
+        self.assertEqual(second['X-Page-Cache'], 'HIT')
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertIn('Cookie', second['Vary'])
+        self.assertIn('Authorization', second['Vary'])
+        self.assertIn('private', second['Cache-Control'])
+
+    def test_if_none_match_returns_not_modified(self):
+        logger.info("Testing a matching If-None-Match gets 304 Not Modified")
+        etag = self.client.get(reverse('vendor:vendor_landing'))['ETag']
+        response = self.client.get(reverse('vendor:vendor_landing'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_cached_page_has_each_visitors_csrf_token(self):
+        logger.info("Testing cached pages carry a CSRF token valid for the visitor")
+        self.client.get(reverse('users:help'))
+        visitor = Client(enforce_csrf_checks=True)
+        response = visitor.get(reverse('users:help'))
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+        self.assertIn('csrftoken', response.cookies)
+        response = visitor.post(reverse('users:help'), {'csrfmiddlewaretoken': csrf_input(response), 'name_contact': 'A'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_authenticated_requests_bypass_cache(self):
+        logger.info("Testing session and JWT requests skip the page cache")
+        self.client.get(reverse('users:landing'))
+        self.client.force_login(UserFactory())
+        response = self.client.get(reverse('users:landing'))
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertIn('Cookie', response['Vary'])
+        response = Client().get(reverse('users:landing'), HTTP_AUTHORIZATION='Bearer token')
+        self.assertNotIn('X-Page-Cache', response)
+
+    @override_settings(PAGE_CACHE_SECONDS=0)
+    def test_disabled(self):
+        logger.info("Testing PAGE_CACHE_SECONDS=0 turns the page cache off")
+        self.client.get(reverse('users:signup'))
+        self.assertNotIn('X-Page-Cache', self.client.get(reverse('users:signup')))
@@ -0,0 +1,153 @@
+import uuid
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from vendor.tests import query_budget
+import logging
+
+logger = logging.getLogger(__name__)
+
+PASSWORD = 'B@ns@ri258'
+
+class UserViewQueryBudgetTest(query_budget.QueryBudgetTestCase):
+    urlconf_namespace = 'users'
+    BUDGETS = {
+        'landing': 0,
+        'signup': 0,
+        'help': 1,
+        'api_signup': 6,
+        'api_login': 12,
+        'logout': 13,
+        'home': 5,
+        'browse_shops': 9,
+        'vendor_detail': 12,
+        'leave_review': 7,
+        'order': 10,
+        'confirm': 5,
+        'my_orders': 5,
+        'profile': 3,
+        'api_user': 5,
+        'token_refresh': 3,
+        'api_user_session': 3,
+        'api_cart': 5,
+        'api_cart_item': 11,
+        'api_order_place': 12,
+        'api_order_history': 4,
+        'api_order_detail': 4,
+    }
+
+    def test_landing(self):
+        logger.info("Testing the landing page query budget")
+        self.assert_budget('landing', lambda client, data: client.get(reverse('users:landing')))
+
+    def test_signup(self):
+        logger.info("Testing the signup page query budget")
+        self.assert_budget('signup', lambda client, data: client.get(reverse('users:signup')))
+
+    def test_help(self):
+        logger.info("Testing the help page query budget")
+        self.assert_budget('help', lambda client, data: client.post(reverse('users:help'), {
+            'name_contact': 'Ann', 'email_contact': 'ann@example.com', 'message_contact': 'Hello',
+        }))
+
+    def test_api_signup(self):
+        logger.info("Testing the signup API query budget")
+        self.assert_budget('api_signup', lambda client, data: client.post(reverse('users:api_signup'), {
+            'first_name': 'New', 'last_name': 'User', 'email': f'{uuid.uuid4().hex}@example.com',
+            'password': PASSWORD, 'confirm_password': PASSWORD,
+        }, content_type='application/json'))
+
+    def test_api_login(self):
+        logger.info("Testing the login API query budget")
+        self.assert_budget('api_login', lambda client, data: client.post(reverse('users:api_login'), {
+            'email': data.customer.email, 'password': PASSWORD,
+        }, content_type='application/json'))
+
+    def test_logout(self):
+        logger.info("Testing the logout API query budget")
+        self.assert_budget('logout', lambda client, data: client.post(reverse('users:logout'), {
+            'refresh_token': str(RefreshToken.for_user(data.customer)),
+        }, content_type='application/json'), login='customer', jwt=True)
+
+    def test_home(self):
+        logger.info("Testing the home page query budget")
+        self.assert_budget('home', lambda client, data: client.get(reverse('users:home')), login='customer')
+
+    def test_browse_shops(self):
+        logger.info("Testing the browse page query budget")
+        self.assert_budget('browse_shops', lambda client, data: client.get(reverse('users:browse_shops')), login='customer')
+
+    def test_vendor_detail(self):
+        logger.info("Testing the vendor detail page query budget")
+        self.assert_budget(
+            'vendor_detail', lambda client, data: client.get(reverse('users:vendor_detail', args=[data.vendor.id])),
+            login='customer',
+        )
+
+    def test_leave_review(self):
+        logger.info("Testing the leave review query budget")
+        self.assert_budget('leave_review', lambda client, data: client.post(
+            reverse('users:leave_review', args=[data.vendor.id]),
+            {'food_quality': 4, 'service': 5, 'punctuality': 4, 'price': 3, 'comment': 'Good'},
+        ), login='customer')
+
+    def test_order(self):
+        logger.info("Testing the order page query budget")
+        self.assert_budget(
+            'order', lambda client, data: client.get(reverse('users:order', args=[data.vendor.id])), login='customer',
+        )
+
+    def test_confirm(self):
+        logger.info("Testing the confirm page query budget")
+        self.assert_budget('confirm', lambda client, data: client.get(reverse('users:confirm')), login='customer')
+
+    def test_my_orders(self):
+        logger.info("Testing the my orders page query budget")
+        self.assert_budget('my_orders', lambda client, data: client.get(reverse('users:my_orders')), login='customer')
+
+    def test_profile(self):
+        logger.info("Testing the profile page query budget")
+        self.assert_budget('profile', lambda client, data: client.get(reverse('users:profile')), login='customer')
+
+    def test_api_user(self):
+        logger.info("Testing the user API query budget")
+        self.assert_budget('api_user', lambda client, data: client.get(reverse('users:api_user')), login='customer', jwt=True)
+
+    def test_token_refresh(self):
+        logger.info("Testing the token refresh query budget")
+        self.assert_budget('token_refresh', lambda client, data: client.post(reverse('users:token_refresh'), {
+            'refresh': str(RefreshToken.for_user(data.customer)),
+        }, content_type='application/json'))
+
+    def test_api_user_session(self):
+        logger.info("Testing the user session API query budget")
+        self.assert_budget(
+            'api_user_session', lambda client, data: client.get(reverse('users:api_user_session')), login='customer', jwt=True,
+        )
+
+    def test_api_cart(self):
+        logger.info("Testing the cart API query budget")
+        self.assert_budget('api_cart', lambda client, data: client.get(reverse('users:api_cart')), login='customer', jwt=True)
+
+    def test_api_cart_item(self):
+        logger.info("Testing the cart item API query budget")
+        self.assert_budget('api_cart_item', lambda client, data: client.post(
+            reverse('users:api_cart_item', args=[data.item.id]), {'qty': 2}, content_type='application/json',
+        ), login='customer', jwt=True)
+
+    def test_api_order_place(self):
+        logger.info("Testing the order placement API query budget")
+        self.assert_budget('api_order_place', lambda client, data: client.post(reverse('users:api_order_place'), {
+            'address': '1 Road', 'city': 'Test City', 'postal_code': '12345',
+        }, content_type='application/json'), login='customer', jwt=True)
+
+    def test_api_order_history(self):
+        logger.info("Testing the order history API query budget")
+        self.assert_budget(
+            'api_order_history', lambda client, data: client.get(reverse('users:api_order_history')), login='customer', jwt=True,
+        )
+
+    def test_api_order_detail(self):
+        logger.info("Testing the order detail API query budget")
+        self.assert_budget('api_order_detail', lambda client, data: client.get(
+            reverse('users:api_order_detail', args=[data.past_order.id]),
+        ), login='customer', jwt=True)
@@ -0,0 +1,118 @@
+from unittest import skipUnless
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from users.context_processors import get_cart_summary
+from users.models import Cart
+from vendor.tests.factories import VendorFactory, MenuItemFactory, OrderFactory, ReviewFactory
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tables expected to grow without bound; a plain table scan on any of them is a regression
+LARGE_TABLES = {
+    'auth_user', 'django_session', 'vendor_vendor', 'vendor_menuitem', 'vendor_order',
+    'vendor_orderarchive', 'vendor_review', 'vendor_menuitempairing', 'users_cart', 'users_cartline',
+}
+
+class QueryCollector:
+    # execute_wrapper hook recording every statement with its parameters
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+def full_scans(sql, params, allowed=()):
+    """Return the EXPLAIN QUERY PLAN lines that scan a large table.
+
+    A ``SCAN`` walks the whole table, or the whole of an index (``USING
+    [COVERING] INDEX``, e.g. to return rows in index order), either of which
+    grows with the table; only lookups (``SEARCH``) are bounded. ``allowed``
+    holds ``(sql, plan)`` pairs: a plan line containing ``plan`` is not
+    reported for a query containing ``sql``.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        plan = [row[-1] for row in cursor.fetchall()]
+    scans = []
+    for line in plan:
+        words = line.split()
+        if len(words) >= 2 and words[0] == 'SCAN' and words[1].strip('"') in LARGE_TABLES:
+            if not any(query in sql and scan in line for query, scan in allowed):
+                scans.append(line)
+    return scans
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite syntax')
+class HotQueryPlanTest(TestCase):
+    """Run each hot view, EXPLAIN every SELECT it issued and fail on full table scans."""
+
+    def setUp(self):
+        cache.clear()
+        self.vendor = VendorFactory()
+        self.item = MenuItemFactory(vendor=self.vendor)
+        self.customer = self.vendor.user.__class__.objects.create_user(
+            username='plan@example.com', email='plan@example.com', password='B@ns@ri258'
+        )
+        OrderFactory(vendor=self.vendor, user=self.customer, order_items={
+            str(self.item.id): {'qty': 1, 'name': self.item.name, 'price': 10.99, 'total': 10.99},
+        })
+        OrderFactory(vendor=self.vendor, user=self.customer, status='completed')
+        ReviewFactory(vendor=self.vendor, user=self.customer)
+        Cart.objects.create(user=self.customer).add(self.item, 1)
+
+    def assert_no_full_scans(self, run, allowed=()):
+        """``allowed`` lists the ``(sql, plan)`` substrings of each scan this view needs, see full_scans."""
+        collector = QueryCollector()
+        with connection.execute_wrapper(collector):
+            run()
+        self.assertTrue(collector.queries)
+        failures = []
+        for sql, params in collector.queries:
+            for line in full_scans(sql, params, allowed):
+                failures.append(f'{line}\n    {sql}')
+        self.assertFalse(failures, 'Full table scans:\n' + '\n'.join(failures))
+
+    def get(self, name, *args):
+        def run():
+            response = self.client.get(reverse(name, args=args))
+            self.assertEqual(response.status_code, 200)
+        return run
+
+    def test_browse_shops(self):
+        logger.info("Testing browse_shops query plans")
+        self.client.force_login(self.customer)
+        self.assert_no_full_scans(self.get('users:browse_shops'), allowed=(
+            # The page walks vendor_rating_idx in order and stops after the page
+            ('ORDER BY "vendor_vendor"."rating" DESC, "vendor_vendor"."id" DESC LIMIT ', 'USING INDEX vendor_rating_idx'),
+            # The vendor total and category facets count every vendor by design, from the smallest index
+            ('SELECT COUNT(*) AS "__count" FROM "vendor_vendor"', 'USING COVERING INDEX'),
+            ('SELECT "vendor_vendor"."category" AS "category", COUNT("vendor_vendor"."id")', 'USING COVERING INDEX vendor_category_idx'),
+        ))
+
+    def test_vendor_detail(self):
+        logger.info("Testing vendor_detail query plans")
+        self.client.force_login(self.customer)
+        self.assert_no_full_scans(self.get('users:vendor_detail', self.vendor.id))
+
+    def test_my_orders(self):
+        logger.info("Testing my_orders query plans")
+        self.client.force_login(self.customer)
+        self.assert_no_full_scans(self.get('users:my_orders'))
+
+    def test_cart_count(self):
+        logger.info("Testing cart_count query plans")
+        self.assert_no_full_scans(lambda: get_cart_summary(self.customer.id))
+
+    def test_vendor_orders(self):
+        logger.info("Testing vendor orders query plans")
+        self.client.force_login(self.vendor.user)
+        self.assert_no_full_scans(self.get('vendor:orders'))
+
+    def test_vendor_home(self):
+        logger.info("Testing vendor_home query plans")
+        self.client.force_login(self.vendor.user)
+        self.assert_no_full_scans(self.get('vendor:vendor_home'))
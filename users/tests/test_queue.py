@@ -0,0 +1,192 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from django.core import mail
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from users.models import Task
+from users.queue import Worker, claim, enqueue, execute, task, task_metrics
+from vendor.tasks import recompute_vendor_rating, shrink_image
+from vendor.tests.factories import UserFactory, VendorFactory, MenuItemFactory, ReviewFactory
+import factory
+import logging
+
+logger = logging.getLogger(__name__)
+
+calls = []
+
+@task(name='tests.record', max_attempts=3)
+def record(value):
+    calls.append(value)
+
+@task(name='tests.explode', max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_claim_and_run(self):
+        logger.info("Testing a queued task is claimed, run and timed")
+        queued = record.enqueue(value=1)
+        self.assertEqual(claim('w1', 10), [queued.id])
+        self.assertEqual(claim('w2', 10), [])
+        self.assertEqual(execute(queued.id, 'w1'), 'succeeded')
+        queued.refresh_from_db()
+        self.assertEqual(calls, [1])
+        self.assertEqual((queued.status, queued.attempts), ('succeeded', 1))
+        self.assertIsNotNone(queued.run_ms)
+        self.assertIsNotNone(queued.wait_ms)
+        self.assertEqual(task_metrics()['tests.record']['counts']['succeeded'], 1)
+
+    def test_delay(self):
+        logger.info("Testing a delayed task is not claimed early")
+        queued = record.enqueue(delay=60, value=1)
+        self.assertEqual(claim('w1', 10), [])
+        self.assertEqual(claim('w1', 10, now=timezone.now() + timedelta(seconds=61)), [queued.id])
+
+    def test_failure_retries_with_backoff_then_fails(self):
+        logger.info("Testing a failing task backs off and fails after max_attempts")
+        queued = explode.enqueue()
+        claim('w1', 10)
+        self.assertEqual(execute(queued.id, 'w1'), 'queued')
+        queued.refresh_from_db()
+        self.assertGreater(queued.visible_at, timezone.now())
+        self.assertIn('RuntimeError: boom', queued.last_error)
+        self.assertEqual(claim('w1', 10), [])
+
+        claim('w1', 10, now=queued.visible_at)
+        self.assertEqual(execute(queued.id, 'w1'), 'failed')
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), ('failed', 2))
+
+    def test_expired_lease_is_reclaimed(self):
+        logger.info("Testing a task whose worker died is picked up after its visibility timeout")
+        queued = enqueue('tests.record', {'value': 2}, timeout=30)
+        claim('dead', 10)
+        self.assertEqual(claim('w2', 10, now=timezone.now() + timedelta(seconds=10)), [])
+        self.assertEqual(claim('w2', 10, now=timezone.now() + timedelta(seconds=31)), [queued.id])
+        # The first worker lost its lease and cannot record an outcome
+        self.assertIsNone(execute(queued.id, 'dead'))
+        self.assertEqual(execute(queued.id, 'w2'), 'succeeded')
+        self.assertEqual(Task.objects.get(id=queued.id).attempts, 2)
+
+    def test_unique_tasks_are_coalesced(self):
+        logger.info("Testing unique tasks are queued once per arguments")
+        first = recompute_vendor_rating.enqueue(vendor_id=1)
+        self.assertEqual(recompute_vendor_rating.enqueue(vendor_id=1).id, first.id)
+        self.assertNotEqual(recompute_vendor_rating.enqueue(vendor_id=2).id, first.id)
+
+class TaskHandOffTest(TestCase):
+    def run_queue(self):
+        for task_id in claim('test', 100):
+            execute(task_id, 'test')
+
+    def test_help_message_is_mailed_by_the_worker(self):
+        logger.info("Testing help contact messages are queued and mailed")
+        self.client.post(reverse('users:help'), {
+            'name_contact': 'Ann', 'subject_contact': 'Refund', 'email_contact': 'ann@example.com', 'message_contact': 'Hi',
+        })
+        self.assertEqual(len(mail.outbox), 0)
+        self.run_queue()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].reply_to, ['ann@example.com'])
+        self.assertIn('Refund', mail.outbox[0].subject)
+
+    def test_review_queues_rating_recompute(self):
+        logger.info("Testing a new review recomputes the vendor rating in the background")
+        vendor = VendorFactory(rating=0.0)
+        ReviewFactory(vendor=vendor, overall_rating=3.0)
+        self.client.force_login(UserFactory())
+        self.client.get(reverse('users:vendor_detail', args=[vendor.id]))
+        vendor.refresh_from_db()
+        self.assertEqual(vendor.rating, 0.0)  # Page views no longer write
+
+        self.client.post(reverse('users:vendor_detail', args=[vendor.id]), {'overall_rating': '5'})
+        self.run_queue()
+        vendor.refresh_from_db()
+        self.assertEqual(vendor.rating, 8.0)
+        self.assertTrue(Task.objects.filter(name='vendor.tasks.refresh_leaderboard', status='queued').exists())
+
+class ShrinkImageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root, ignore_errors=True)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media_root))
+        super().setUpClass()
+
+    def setUp(self):
+        self.item = MenuItemFactory(image=factory.django.ImageField(filename='big.jpg', width=2400, height=1200))
+        self.original = self.item.image.name
+
+    def test_shrink_image(self):
+        logger.info("Testing uploaded images are downscaled by a task")
+        shrink_image(model='vendor.MenuItem', pk=self.item.pk, field='image')
+        self.item.refresh_from_db()
+        with self.item.image.open('rb') as image:
+            self.assertEqual(Image.open(image).size, (1200, 600))
+        self.assertNotEqual(self.item.image.name, self.original)
+        self.assertFalse(self.item.image.storage.exists(self.original))
+
+    def test_failed_update_keeps_original(self):
+        logger.info("Testing the original image survives a failure after the shrunk copy is written")
+        storage = self.item.image.storage
+        with mock.patch('django.db.models.query.QuerySet.update', side_effect=OperationalError('disk full')):
+            with self.assertRaises(OperationalError):
+                shrink_image(model='vendor.MenuItem', pk=self.item.pk, field='image')
+        self.item.refresh_from_db()
+        self.assertEqual(self.item.image.name, self.original)
+        self.assertTrue(storage.exists(self.original))
+        self.assertEqual(storage.listdir('menu_images')[1], [os.path.basename(self.original)])
+        # A retry starts from the intact original
+        shrink_image(model='vendor.MenuItem', pk=self.item.pk, field='image')
+        self.item.refresh_from_db()
+        with self.item.image.open('rb') as image:
+            self.assertEqual(Image.open(image).size, (1200, 600))
+
+class WorkerTest(TransactionTestCase):
+    """Runs on a file-backed SQLite database, like the one the worker uses in production.
+
+    The default test database is in-memory with a shared cache, where a read
+    that overlaps another connection's write fails at once with "table is
+    locked" instead of waiting, so concurrent pool threads cannot share it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, directory, ignore_errors=True)
+        # Pool threads open their own connections from connections.settings; the main
+        # thread's in-memory connection is set aside, since closing it would drop that database
+        cls.enterClassContext(mock.patch.dict(connections.settings, default={
+            **connections.settings['default'], 'NAME': os.path.join(directory, 'worker.sqlite3'),
+        }))
+        cls.memory_connection = connections['default']
+        connections['default'] = connections.create_connection('default')
+        call_command('migrate', verbosity=0, interactive=False)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['default'].close()
+        connections['default'] = cls.memory_connection
+
+    def test_burst_run_on_thread_pool(self):
+        logger.info("Testing runworker's pool drains the queue with concurrent threads")
+        calls.clear()
+        for value in range(20):
+            record.enqueue(value=value)
+        processed = Worker(concurrency=4, poll_interval=0.05).run(burst=True)
+        self.assertEqual(processed, {'succeeded': 20})
+        self.assertEqual(sorted(calls), list(range(20)))
+        # Each task was leased exactly once
+        self.assertEqual(set(Task.objects.values_list('attempts', flat=True)), {1})
@@ -0,0 +1,62 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from users.models import Cart
+from users.services import place_order, OrderPlacementError
+from vendor.archive import archive_orders
+from vendor.models import Order, OrderArchive
+from vendor.tests.factories import UserFactory, VendorFactory, MenuItemFactory
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PlaceOrderServiceTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.vendor = VendorFactory(delivery=True)
+        self.item = MenuItemFactory(vendor=self.vendor, price=15.00)
+        self.address = {'address': '1 Test Street', 'city': 'Test City', 'postal_code': '12345'}
+
+    def test_place_order_prices_items_server_side(self):
+        logger.info("Testing place_order resolves prices from MenuItem")
+        order, created = place_order(self.user, self.vendor.id, {self.item.id: 2}, **self.address)
+        self.assertTrue(created)
+        self.assertEqual(order.total_amount, 40.00)
+        self.assertEqual(order.item_count, 2)
+
+    def test_replayed_key_returns_existing_order(self):
+        logger.info("Testing place_order is idempotent per key")
+        first, created = place_order(self.user, self.vendor.id, {self.item.id: 1}, idempotency_key='abc', **self.address)
+        with self.assertNumQueries(1):
+            second, replay_created = place_order(self.user, self.vendor.id, {self.item.id: 1}, idempotency_key='abc', **self.address)
+        self.assertTrue(created)
+        self.assertFalse(replay_created)
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 1)
+
+    def test_replayed_key_of_archived_order(self):
+        logger.info("Testing place_order finds a replayed key's order after it was archived")
+        first, _ = place_order(self.user, self.vendor.id, {self.item.id: 1}, idempotency_key='abc', **self.address)
+        Order.objects.filter(id=first.id).update(status='completed')
+        archive_orders(now=timezone.now() + timedelta(days=365))
+        second, created = place_order(self.user, self.vendor.id, {self.item.id: 1}, idempotency_key='abc', **self.address)
+        self.assertFalse(created)
+        self.assertIsInstance(second, OrderArchive)
+        self.assertEqual(second.id, first.id)
+        self.assertFalse(Order.objects.exists())
+
+    def test_unavailable_item_rolls_back(self):
+        logger.info("Testing place_order rejects items that are not on the vendor's menu")
+        foreign_item = MenuItemFactory()
+        with self.assertRaises(OrderPlacementError):
+            place_order(self.user, self.vendor.id, {self.item.id: 1, foreign_item.id: 1}, **self.address)
+        self.assertFalse(Order.objects.exists())
+
+    def test_clear_cart(self):
+        logger.info("Testing place_order clears the cart in the same transaction")
+        cart = Cart.objects.create(user=self.user)
+        cart.add(self.item, 3)
+        place_order(self.user, cart.vendor_id, {self.item.id: 3}, clear_cart=True, **self.address)
+        cart.refresh_from_db()
+        self.assertIsNone(cart.vendor_id)
+        self.assertFalse(cart.lines.exists())
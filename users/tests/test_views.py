@@ -5,6 +5,11 @@ from users.tests.factories import ProfileFactory
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.db.models.signals import post_save
 from rest_framework.test import APIClient
+from users.models import Cart
+from vendor.models import Order
+from vendor.tests.factories import VendorFactory, MenuItemFactory, OrderFactory
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 import logging
 
 logger = logging.getLogger(__name__)
@@ -123,4 +128,65 @@ class ProfileViewTest(TestCase):
         logger.info("Testing profile page with unauthenticated user")
         response = self.client.get(self.profile_url)
         self.assertEqual(response.status_code, 302)
-        self.assertRedirects(response, reverse('users:landing'))
\ No newline at end of file
+        self.assertRedirects(response, reverse('users:landing'))
+class ConfirmViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.confirm_url = reverse('users:confirm')
+        self.user = User.objects.create_user(
+            username='bansarishah258+confirm@gmail.com',
+            email='bansarishah258+confirm@gmail.com',
+            password='B@ns@ri258'
+        )
+        self.client.force_login(self.user)
+        self.vendor = VendorFactory(delivery=True)
+        self.item = MenuItemFactory(vendor=self.vendor, price=20.00)
+
+    def test_confirm_uses_server_side_cart_totals(self):
+        logger.info("Testing confirm view prices the order from the server-side cart")
+        cart = Cart.objects.create(user=self.user)
+        cart.add(self.item, 2)
+        response = self.client.post(self.confirm_url, {
+            'first_name': 'Test',
+            'last_name': 'User',
+            'phone': '1234567890',
+            'address': '1 Test Street',
+            'city': 'Test City',
+            'postal_code': '12345',
+            'payment_method': 'cash',
+            'order': '{"%d": {"qty": 2, "total": 0.01}}' % self.item.id,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'users/confirm.html')
+        order = Order.objects.get(user=self.user)
+        self.assertEqual(order.total_amount, 50.00)
+        self.assertEqual(order.order_items[str(self.item.id)]['qty'], 2)
+        self.assertFalse(cart.lines.exists())
+
+    def test_confirm_without_cart(self):
+        logger.info("Testing confirm view with an empty cart")
+        response = self.client.get(self.confirm_url)
+        self.assertRedirects(response, reverse('users:home'), fetch_redirect_response=False)
+
+class MyOrdersViewTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('users:my_orders')
+        self.user = User.objects.create_user(
+            username='bansarishah258+myorders@gmail.com',
+            email='bansarishah258+myorders@gmail.com',
+            password='B@ns@ri258'
+        )
+        self.client.force_login(self.user)
+
+    def test_past_orders_query_count_is_constant(self):
+        logger.info("Testing my_orders does not query per past order")
+        OrderFactory.create_batch(3, user=self.user, status='completed')
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(self.url)
+        OrderFactory.create_batch(10, user=self.user, status='completed')
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(self.url)
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(len(response.context['past_orders']), 13)
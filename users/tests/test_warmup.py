@@ -0,0 +1,92 @@
+from io import StringIO
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.core.signals import request_finished, request_started
+from django.test import TestCase, SimpleTestCase
+from foodflex.metrics import registry
+from foodflex.warmup import STEPS, import_times, lifespan, warm_pages, warmup
+import logging
+
+logger = logging.getLogger(__name__)
+
+class WarmupTest(TestCase):
+    # warm_database connects to every configured alias
+    databases = '__all__'
+
+    def test_every_step_runs(self):
+        logger.info("Testing warmup() runs and reports every step")
+        report = warmup()
+        self.assertEqual([step for step, _, _ in report], [step for step, _ in STEPS])
+        for step, seconds, count in report:
+            self.assertIsNotNone(count, step)
+            self.assertGreaterEqual(seconds, 0)
+        self.assertGreater(dict((step, count) for step, _, count in report)['templates'], 0)
+
+    def test_failing_step_does_not_stop_the_rest(self):
+        logger.info("Testing a failing warm-up step is logged and skipped")
+        def broken():
+            raise RuntimeError('boom')
+        with mock.patch('foodflex.warmup.STEPS', (('broken', broken),) + STEPS[:1]):
+            with self.assertLogs('foodflex.warmup', 'ERROR'):
+                report = warmup()
+        self.assertIsNone(report[0][2])
+        self.assertIsNotNone(report[1][2])
+
+    def test_pages_stay_out_of_metrics(self):
+        logger.info("Testing warm-up page requests skip the metrics middleware and the request signals")
+        registry.clear()
+        signals = []
+
+        def receiver(sender, **kwargs):
+            signals.append(sender)
+
+        request_started.connect(receiver)
+        request_finished.connect(receiver)
+        try:
+            self.assertEqual(warm_pages(), 4)
+        finally:
+            request_started.disconnect(receiver)
+            request_finished.disconnect(receiver)
+        self.assertEqual(signals, [])
+        counters = registry.snapshot()['counters']
+        self.assertEqual([name for name, _, _ in counters if name.startswith('foodflex_http_')], [])
+
+    def test_command(self):
+        logger.info("Testing manage.py warmup prints the report")
+        out = StringIO()
+        call_command('warmup', stdout=out)
+        self.assertIn('templates', out.getvalue())
+        self.assertIn('total', out.getvalue())
+
+class LifespanTest(SimpleTestCase):
+    def test_startup_and_shutdown(self):
+        logger.info("Testing the ASGI lifespan handler warms up and acknowledges both phases")
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        with mock.patch('foodflex.warmup.warmup') as warm:
+            async_to_sync(lifespan)(receive, send)
+        warm.assert_called_once()
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+
+class ImportTimesTest(SimpleTestCase):
+    def test_parses_importtime_output(self):
+        logger.info("Testing python -X importtime output is parsed")
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     _io\n"
+            "import time:      2500 |       9000 |   django.db\n"
+            "import time:       300 |      12000 | django\n"
+        )
+        self.assertEqual(import_times(stderr), [
+            ('_io', 120, 120, 5),
+            ('django.db', 2500, 9000, 3),
+            ('django', 300, 12000, 1),
+        ])
@@ -25,4 +25,9 @@ urlpatterns = [
     path('api/user/', views.UserProfileAPIView.as_view(), name='api_user'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/user/session/', views.UserSessionAPIView.as_view(), name='api_user_session'),
+    path('api/cart/', views.CartAPIView.as_view(), name='api_cart'),
+    path('api/cart/items/<int:menu_item_id>/', views.CartItemAPIView.as_view(), name='api_cart_item'),
+    path('api/orders/', views.OrderPlaceAPIView.as_view(), name='api_order_place'),
+    path('api/orders/history/', views.OrderHistoryAPIView.as_view(), name='api_order_history'),
+    path('api/orders/<int:order_id>/', views.OrderDetailAPIView.as_view(), name='api_order_detail'),
 ]
\ No newline at end of file
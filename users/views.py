@@ -9,18 +9,28 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate, login, logout
-from django.db.models import Avg
+from django.db.models import Avg, Count, Max, OuterRef, Subquery
 from django.utils import timezone
 from django.core.serializers.json import DjangoJSONEncoder
 from django.http import JsonResponse
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.urls import reverse
+from django.views.decorators.csrf import ensure_csrf_cookie
+import hashlib
 import json
 import logging
-from vendor.models import Vendor, MenuItem, Order, Review
+import uuid
+from vendor.models import Vendor, MenuItem, Order, OrderHistory, Review, MenuItemPairing
+from vendor.leaderboard import get_leaderboard
+from vendor.tasks import recompute_vendor_rating
+from foodflex.cache import cache_anonymous_page
+from foodflex.conditional import conditional
 from .serializers import UserSignupSerializer, UserLoginSerializer
-from .models import Profile
+from .models import Profile, Cart, CartLine
+from .services import place_order, OrderPlacementError
+from .tasks import send_contact_message
+from .pagination import paginate_by_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -35,29 +45,116 @@ def get_tokens_for_user(user):
 # Add cart context helper function
 def add_cart_context(request):
     vendor_id = request.session.get('vendor_id', 1)  # Default to 1 if not set
-    order_dict = request.session.get('order', {})
-    order_json = json.dumps(order_dict, cls=DjangoJSONEncoder)
     return {
         'vendor_id': vendor_id,
-        'order_json': order_json,
     }
 
+# Cart helpers
+def get_cart(user):
+    cart, created = Cart.objects.get_or_create(user=user)
+    return cart
+
+def cart_payload(cart):
+    items, subtotal = cart.order_items()
+    return {
+        'vendor_id': cart.vendor_id,
+        'items': items,
+        'count': sum(details['qty'] for details in items.values()),
+        'subtotal': float(subtotal),
+    }
+
+# "Goes well with" helpers; pairings are precomputed by the build_recommendations command
+PAIRINGS_PER_ITEM = 3
+
+def pairings_by_item(vendor):
+    pairings = {}
+    rows = MenuItemPairing.objects.filter(
+        vendor=vendor, rank__lt=PAIRINGS_PER_ITEM, paired_item__is_available=True
+    ).select_related('paired_item').order_by('item_id', 'rank')
+    for pairing in rows:
+        pairings.setdefault(pairing.item_id, []).append(pairing.paired_item)
+    return pairings
+
+def menu_version(menu_items, pairings):
+    """Fragment cache version for a vendor's menu sections.
+
+    Changes when an item is added, edited or removed, or when its pairings are rebuilt.
+    """
+    digest = hashlib.md5()
+    for item in menu_items:
+        paired_ids = [paired.id for paired in pairings.get(item.id, [])]
+        digest.update(f'{item.id}:{item.updated_at.timestamp()}:{paired_ids};'.encode())
+    return digest.hexdigest()
+
+def suggested_items(item_ids, limit=4):
+    rows = MenuItemPairing.objects.filter(
+        item_id__in=item_ids, rank__lt=PAIRINGS_PER_ITEM, paired_item__is_available=True
+    ).exclude(paired_item_id__in=item_ids).select_related('paired_item').order_by('-count')
+    suggestions = {}
+    for pairing in rows:
+        suggestions.setdefault(pairing.paired_item_id, pairing.paired_item)
+    return list(suggestions.values())[:limit]
+
+# Conditional GET validators (see foodflex/conditional.py)
+def per_vendor(queryset, aggregate):
+    # Correlated subquery for one aggregate over a vendor's rows
+    return Subquery(queryset.filter(vendor=OuterRef('pk')).order_by().values('vendor').annotate(value=aggregate).values('value'))
+
+def vendor_detail_version(request, vendor_id):
+    """Everything vendor_detail shows, read in two small queries instead of rendering the page."""
+    user = request.user
+    if not user.is_authenticated:
+        return None
+    vendor = Vendor.objects.filter(id=vendor_id).values_list(
+        'updated_at',
+        per_vendor(MenuItem.objects, Count('pk')),
+        per_vendor(MenuItem.objects, Max('updated_at')),
+        per_vendor(MenuItemPairing.objects, Count('pk')),
+        per_vendor(MenuItemPairing.objects, Max('pk')),  # Rebuilt pairings get new ids
+        per_vendor(Review.objects, Count('pk')),
+        per_vendor(Review.objects, Max('updated_at')),
+    ).first()
+    if vendor is None:
+        return None
+    cart = CartLine.objects.filter(cart__user=user, cart__vendor_id=vendor_id).order_by('menu_item_id').values_list('menu_item_id', 'qty')
+    return vendor, list(cart)
+
+def my_orders_version(request):
+    if not request.user.is_authenticated:
+        return None
+    # OrderHistory covers ongoing, finished and archived orders; the vendor join catches renamed shops
+    orders = OrderHistory.objects.filter(user=request.user).aggregate(
+        rows=Count('pk'), latest=Max('updated_at'), vendors=Max('vendor__updated_at'),
+    )
+    # The page is stamped "Updated at" to the minute
+    minute = timezone.now().replace(second=0, microsecond=0)
+    return tuple(orders.values()), request.session.get('vendor_id'), minute
+
+def user_profile_version(request):
+    # Saving the user saves the profile too (users.signals), so this covers both
+    return Profile.objects.filter(user=request.user).values_list('updated_at', flat=True).first()
+
 # Landing page (publicly accessible)
+@cache_anonymous_page
 def landing(request):
     context = add_cart_context(request)
     return render(request, 'landing.html', context)
 
 # User Signup Page (publicly accessible)
+@cache_anonymous_page
 def signup(request):
     return render(request, 'users/signup.html')
 
 # Help Page (publicly accessible)
+@cache_anonymous_page
 def help(request):
     if request.method == 'POST':
         name = request.POST.get('name_contact')
         subject = request.POST.get('subject_contact')
         email = request.POST.get('email_contact')
         message = request.POST.get('message_contact')
+        if message:
+            send_contact_message.enqueue(name=name, subject=subject, email=email, message=message)
 
         if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return JsonResponse({'success': True})
@@ -79,7 +176,7 @@ class UserSignupAPIView(APIView):
             # Create the Profile object for the user
             Profile.objects.get_or_create(user=user)
             tokens = get_tokens_for_user(user)
-            logger.info(f"User {user.email} signed up successfully.")
+            logger.info("User %s signed up successfully.", user.email)
             return Response({
                 'success': True,
                 'message': 'User created successfully',
@@ -111,7 +208,7 @@ class UserLoginAPIView(APIView):
             user_details = data['user_details']  # Dictionary for the response
             # Log the user in for session-based authentication
             login(request, user)
-            logger.info(f"User {user.email} logged in successfully.")
+            logger.info("User %s logged in successfully.", user.email)
             return Response({
                 'success': True,
                 'message': 'Login successful',
@@ -141,7 +238,7 @@ class UserSessionAPIView(APIView):
             }, status=status.HTTP_401_UNAUTHORIZED)
 
         user = request.user
-        logger.info(f"User session data accessed for {user.email}.")
+        logger.info("User session data accessed for %s.", user.email)
         return Response({
             'success': True,
             'user': {
@@ -171,16 +268,17 @@ class UserLogoutAPIView(APIView):
         try:
             token = RefreshToken(refresh_token)
             token.blacklist()
+            email = request.user.email
             # Log the user out of the session
             logout(request)
-            logger.info(f"User {request.user.email} logged out successfully, refresh token blacklisted.")
+            logger.info("User %s logged out successfully, refresh token blacklisted.", email)
             return Response({
                 'success': True,
                 'message': 'Logout successful.',
                 'redirect_url': reverse('users:landing')
             }, status=status.HTTP_200_OK)
         except Exception as e:
-            logger.error(f"Error during logout: {str(e)}", exc_info=True)
+            logger.error("Error during logout: %s", e, exc_info=True)
             return Response({
                 'success': False,
                 'message': 'Error during logout.',
@@ -189,12 +287,18 @@ class UserLogoutAPIView(APIView):
 
 # User Home Page (protected by JWTMiddleware)
 def home(request):
-    top_vendors = Vendor.objects.all().order_by('-rating')[:5]
     category_choices = dict(Vendor.CATEGORY_CHOICES)
+    entries = get_leaderboard('global', limit=5)
+    if entries:
+        top_vendors = [(entry.vendor, entry.average_rating) for entry in entries]
+    else:
+        # Leaderboard not built yet (see the refresh_leaderboard command)
+        top_vendors = [(vendor, vendor.rating) for vendor in Vendor.objects.all().order_by('-rating')[:5]]
     top_vendors_with_display = []
-    for vendor in top_vendors:
+    for vendor, rating in top_vendors:
         vendor_data = {
             'vendor': vendor,
+            'rating': rating,
             'category_display': category_choices.get(vendor.category, vendor.category.title()),
             'takeaway': vendor.takeaway if vendor.takeaway is not None else False,
             'delivery': vendor.delivery if vendor.delivery is not None else False,
@@ -215,18 +319,23 @@ def browse_shops(request):
     query = request.GET.get('q', '')
     if query:
         vendors = vendors.filter(restaurant_name__icontains=query) | vendors.filter(area__icontains=query) | vendors.filter(city__icontains=query)
+    category = request.GET.get('category', '')
+    if category in dict(Vendor.CATEGORY_CHOICES):
+        vendors = vendors.filter(category=category)
 
-    vendors = vendors.annotate(avg_rating=Avg('reviews__overall_rating')).order_by('-avg_rating')
+    # Vendor.rating holds the denormalised review average, so ordering uses vendor_rating_idx
+    vendors = vendors.order_by('-rating', '-id')
 
     paginator = Paginator(vendors, 12)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
+    category_counts = dict(Vendor.objects.order_by().values_list('category').annotate(count=Count('id')))
     categories = [
-        {'name': 'Restaurant & Cafe', 'count': Vendor.objects.filter(category='restaurant').count()},
-        {'name': 'Cloud Kitchen', 'count': Vendor.objects.filter(category='cloud_kitchen').count()},
-        {'name': 'Tiffin Service', 'count': Vendor.objects.filter(category='tiffin').count()},
-        {'name': 'Stall', 'count': Vendor.objects.filter(category='stall').count()},
+        {'name': 'Restaurant & Cafe', 'count': category_counts.get('restaurant', 0)},
+        {'name': 'Cloud Kitchen', 'count': category_counts.get('cloud_kitchen', 0)},
+        {'name': 'Tiffin Service', 'count': category_counts.get('tiffin', 0)},
+        {'name': 'Stall', 'count': category_counts.get('stall', 0)},
     ]
 
     top_categories = [
@@ -240,16 +349,15 @@ def browse_shops(request):
         {'name': 'Chinese', 'image': '/static/img/cat_listing_8.jpg'},
     ]
 
+    # Vendors whose average (on the 1-10 scale) is at least each threshold; range scans on vendor_rating_idx
     rating_counts = {
-        '9': Vendor.objects.filter(reviews__overall_rating__gte=4.5).distinct().count(),
-        '8': Vendor.objects.filter(reviews__overall_rating__gte=4.0).distinct().count(),
-        '7': Vendor.objects.filter(reviews__overall_rating__gte=3.5).distinct().count(),
-        '6': Vendor.objects.filter(reviews__overall_rating__gte=3.0).distinct().count(),
+        threshold: Vendor.objects.filter(rating__gte=float(threshold)).count()
+        for threshold in ('9', '8', '7', '6')
     }
 
     context = {
         'vendors': page_obj,
-        'vendor_count': vendors.count(),
+        'vendor_count': paginator.count,
         'location': 'Convent Street 2983',
         'categories': categories,
         'top_categories': top_categories,
@@ -259,44 +367,25 @@ def browse_shops(request):
     return render(request, 'users/browseshop.html', context)
 
 # Vendor Detail Page (protected by JWTMiddleware)
+@ensure_csrf_cookie
+@conditional(vendor_detail_version)
 def vendor_detail(request, vendor_id):
+    if request.method == 'POST':
+        return submit_vendor_review(request, vendor_id)
+
     vendor = get_object_or_404(Vendor, id=vendor_id)
-    
     reviews = Review.objects.filter(vendor=vendor).order_by('-created_at')
-    score = vendor.average_rating
+    rating = reviews.aggregate(average=Avg('overall_rating'))
+    score = round(rating['average'] * 2, 1) if rating['average'] is not None else 0.0
     score_on_5 = score / 2
 
-    vendor.rating = score
-    vendor.save()
-
-    if request.method == 'POST':
-        if Review.objects.filter(user=request.user, vendor=vendor).exists():
-            messages.error(request, 'You have already reviewed this vendor.')
-            return redirect('users:vendor_detail', vendor_id=vendor_id)
+    cart = Cart.objects.filter(user=request.user, vendor=vendor).first()
 
-        try:
-            overall_rating = float(request.POST.get('overall_rating'))
-            if not (1 <= overall_rating <= 5):
-                messages.error(request, 'Rating must be between 1 and 5.')
-                return redirect('users:vendor_detail', vendor_id=vendor_id)
-        except (ValueError, TypeError):
-            messages.error(request, 'Invalid rating value.')
-            return redirect('users:vendor_detail', vendor_id=vendor_id)
-
-        comment = request.POST.get('comment')
-
-        Review.objects.create(
-            user=request.user,
-            vendor=vendor,
-            overall_rating=overall_rating,
-            comment=comment
-        )
-        messages.success(request, 'Your review has been submitted successfully.')
-        return redirect('users:vendor_detail', vendor_id=vendor_id)
-
-    menu_items = vendor.menu_items.all()
+    menu_items = list(vendor.menu_items.all())
+    pairings = pairings_by_item(vendor)
     menu_items_by_section = {}
     for item in menu_items:
+        item.goes_well_with = pairings.get(item.id, [])
         category = item.category or "General"
         if category not in menu_items_by_section:
             menu_items_by_section[category] = []
@@ -313,16 +402,44 @@ def vendor_detail(request, vendor_id):
     context = {
         'vendor': vendor,
         'menu_items_by_section': menu_items_by_section,
+        'menu_version': menu_version(menu_items, pairings),
         'menu_items_json': menu_items_json,
         'score': round(score, 1),
         'score_on_5': round(score_on_5, 1),
         'review_count': reviews.count(),
         'reviews': reviews,
         'vendor_id': vendor_id,
-        'order_json': request.GET.get('order', '{}'),
+        'cart_json': json.dumps(cart_payload(cart) if cart else None),
     }
     return render(request, 'users/detail-restaurant.html', context)
 
+def submit_vendor_review(request, vendor_id):
+    vendor = get_object_or_404(Vendor, id=vendor_id)
+    if Review.objects.filter(user=request.user, vendor=vendor).exists():
+        messages.error(request, 'You have already reviewed this vendor.')
+        return redirect('users:vendor_detail', vendor_id=vendor_id)
+
+    try:
+        overall_rating = float(request.POST.get('overall_rating'))
+        if not (1 <= overall_rating <= 5):
+            messages.error(request, 'Rating must be between 1 and 5.')
+            return redirect('users:vendor_detail', vendor_id=vendor_id)
+    except (ValueError, TypeError):
+        messages.error(request, 'Invalid rating value.')
+        return redirect('users:vendor_detail', vendor_id=vendor_id)
+
+    comment = request.POST.get('comment')
+
+    Review.objects.create(
+        user=request.user,
+        vendor=vendor,
+        overall_rating=overall_rating,
+        comment=comment
+    )
+    recompute_vendor_rating.enqueue(vendor_id=vendor.id)
+    messages.success(request, 'Your review has been submitted successfully.')
+    return redirect('users:vendor_detail', vendor_id=vendor_id)
+
 # Leave Review (protected by JWTMiddleware)
 def leave_review(request, vendor_id):
     vendor = get_object_or_404(Vendor, id=vendor_id)
@@ -342,15 +459,14 @@ def leave_review(request, vendor_id):
             messages.error(request, 'Ratings must be between 1 and 5.')
             return redirect('users:vendor_detail', vendor_id=vendor_id)
 
+        # Review keeps a single overall rating; the four scores are averaged into it
         Review.objects.create(
             user=request.user,
             vendor=vendor,
-            food_quality=food_quality,
-            service=service,
-            punctuality=punctuality,
-            price=price,
+            overall_rating=(food_quality + service + punctuality + price) / 4,
             comment=comment
         )
+        recompute_vendor_rating.enqueue(vendor_id=vendor.id)
         messages.success(request, 'Your review has been submitted successfully.')
         return redirect('users:vendor_detail', vendor_id=vendor_id)
 
@@ -359,12 +475,13 @@ def leave_review(request, vendor_id):
 # Order View (protected by JWTMiddleware)
 def order_view(request, vendor_id):
     vendor = get_object_or_404(Vendor, id=vendor_id)
+    cart = get_cart(request.user)
 
-    order_data = request.GET.get('order', '{}')
-    order_dict = json.loads(order_data) if order_data else {}
+    if request.session.get('vendor_id') != vendor_id:
+        request.session['vendor_id'] = vendor_id
 
-    request.session['order'] = order_dict
-    request.session['vendor_id'] = vendor_id
+    order_dict, subtotal = cart.order_items() if cart.vendor_id == vendor.id else ({}, 0)
+    suggestions = suggested_items([int(item_id) for item_id in order_dict]) if order_dict else []
 
     menu_items = MenuItem.objects.filter(vendor=vendor, is_available=True).order_by('id')
     
@@ -387,31 +504,17 @@ def order_view(request, vendor_id):
         'order_json': json.dumps(order_dict, cls=DjangoJSONEncoder),
         'menu_items_json': menu_items_json,
         'menu_items': menu_items_list,
+        'suggestions': suggestions,
         'current_date': timezone.now(),
         'current_time': timezone.now(),
+        'idempotency_key': uuid.uuid4().hex,
     }
     context.update(add_cart_context(request))
     return render(request, 'users/order.html', context)
 
 # Confirm View (protected by JWTMiddleware)
 def confirm_view(request):
-    order_items = request.session.get('order', {})
-    vendor_id = request.session.get('vendor_id')
-
-    if not vendor_id or not order_items:
-        messages.error(request, "No order data found. Please place an order first.")
-        return redirect('users:home')
-
-    vendor = get_object_or_404(Vendor, id=vendor_id)
-
-    initial_data = {
-        'first_name': request.session.get('first_name', ''),
-        'last_name': request.session.get('last_name', ''),
-        'phone': request.session.get('phone', ''),
-        'address': '',
-        'city': '',
-        'postal_code': '',
-    }
+    cart = get_cart(request.user)
 
     if request.method == 'POST':
         first_name = request.POST.get('first_name')
@@ -421,72 +524,114 @@ def confirm_view(request):
         city = request.POST.get('city')
         postal_code = request.POST.get('postal_code')
         payment_method = request.POST.get('payment_method')
-        order_data = request.POST.get('order', '{}')
+        idempotency_key = request.POST.get('idempotency_key') or None
 
-        if not all([first_name, last_name, phone, address, city, postal_code, vendor_id]):
+        if not all([first_name, last_name, phone, address, city, postal_code]):
             messages.error(request, "All fields are required.")
-            return redirect('users:order', vendor_id=vendor_id)
+            if cart.vendor_id:
+                return redirect('users:order', vendor_id=cart.vendor_id)
+            return redirect('users:home')
 
+        contact = {
+            'first_name': first_name,
+            'last_name': last_name,
+            'phone': phone,
+            'email': request.POST.get('email', ''),
+        }
+        if any(request.session.get(key) != value for key, value in contact.items()):
+            request.session.update(contact)
+
+        # Totals are priced server-side from the cart; a resubmitted form replays the same order
+        quantities = dict(cart.lines.values_list('menu_item_id', 'qty'))
         try:
-            order_items = json.loads(order_data) if order_data else order_items
-        except json.JSONDecodeError as e:
-            messages.error(request, "Invalid order data. Please try again.")
-            logger.error(f"JSONDecodeError: {e} - Order Data: {order_data}")
-            return redirect('users:order', vendor_id=vendor_id)
-
-        request.session['first_name'] = first_name
-        request.session['last_name'] = last_name
-        request.session['phone'] = phone
-        request.session['email'] = request.POST.get('email', '')
-
-        subtotal = sum(details['total'] for details in order_items.values())
-        delivery_fee = 10.00 if subtotal > 0 and vendor.delivery else 0.00
-        total_amount = subtotal + delivery_fee
-
-        order = Order.objects.create(
-            vendor=vendor,
-            user=request.user,  # Associate the order with the authenticated user
-            user_address=address,
-            user_city=city,
-            user_postal_code=postal_code,
-            order_items=order_items,
-            total_amount=total_amount,
-            status='ongoing',
-        )
+            order, created = place_order(
+                request.user, cart.vendor_id, quantities,
+                address=address, city=city, postal_code=postal_code,
+                idempotency_key=idempotency_key, clear_cart=True,
+            )
+        except OrderPlacementError as e:
+            logger.warning("Order placement failed for user %s: %s", request.user.pk, e)
+            messages.error(request, "No order data found. Please place an order first.")
+            return redirect('users:home')
 
         context = {
             'name': f"{first_name} {last_name}",
             'email': request.session.get('email', 'Not provided'),
             'phone': phone,
-            'address': address,
-            'city': city,
-            'postal_code': postal_code,
+            'address': order.user_address,
+            'city': order.user_city,
+            'postal_code': order.user_postal_code,
             'payment_method': payment_method,
-            'vendor': vendor,
-            'order': order_items,
+            'vendor': order.vendor,
+            'order': order.order_items,
         }
         context.update(add_cart_context(request))
-        request.session.pop('order', None)
-        request.session.pop('vendor_id', None)
         return render(request, 'users/confirm.html', context)
+
+    order_items, subtotal = cart.order_items()
+    if not cart.vendor_id or not order_items:
+        messages.error(request, "No order data found. Please place an order first.")
+        return redirect('users:home')
+
+    vendor = get_object_or_404(Vendor, id=cart.vendor_id)
+
+    initial_data = {
+        'first_name': request.session.get('first_name', ''),
+        'last_name': request.session.get('last_name', ''),
+        'phone': request.session.get('phone', ''),
+        'address': '',
+        'city': '',
+        'postal_code': '',
+    }
     
     context = {
         'initial_data': initial_data,
-        'vendor_id': vendor_id,
+        'vendor': vendor,
+        'vendor_id': vendor.id,
         'order': order_items,
         'order_json': json.dumps(order_items, cls=DjangoJSONEncoder),
+        'idempotency_key': uuid.uuid4().hex,
     }
     context.update(add_cart_context(request))
     return render(request, 'users/order.html', context)
 
+# Order history helpers
+PAST_ORDER_STATUSES = ('completed', 'cancelled')
+ORDER_HISTORY_PAGE_SIZE = 20
+ORDER_SUMMARY_FIELDS = (
+    'id', 'vendor__restaurant_name', 'created_at', 'status', 'total_amount', 'item_count',
+    'user_address', 'user_city', 'user_postal_code',
+)
+
+def order_history_queryset(user, statuses):
+    # Summary columns only: order_items stays in the database until a single order is opened.
+    # OrderHistory also covers orders moved to the archive.
+    return OrderHistory.objects.filter(user=user, status__in=statuses).select_related('vendor').only(*ORDER_SUMMARY_FIELDS)
+
+def order_summary(order):
+    return {
+        'id': order.id,
+        'vendor_name': order.vendor.restaurant_name,
+        'created_at': order.created_at.isoformat(),
+        'status': order.status,
+        'total_amount': float(order.total_amount),
+        'item_count': order.item_count,
+    }
+
 # My Orders View (protected by JWTMiddleware)
+@conditional(my_orders_version)
 def my_orders(request):
-    ongoing_orders = Order.objects.filter(user=request.user, status='ongoing').order_by('-created_at')
-    past_orders = Order.objects.filter(user=request.user).exclude(status='ongoing').order_by('-created_at')
+    ongoing_orders = Order.objects.filter(user=request.user, status='ongoing').select_related('vendor').order_by('-created_at')
+    past_orders, next_cursor = paginate_by_cursor(
+        order_history_queryset(request.user, PAST_ORDER_STATUSES),
+        cursor=request.GET.get('cursor'),
+        limit=ORDER_HISTORY_PAGE_SIZE,
+    )
 
     context = {
         'ongoing_orders': ongoing_orders,
         'past_orders': past_orders,
+        'next_cursor': next_cursor,
         'current_time': timezone.now(),
     }
     context.update(add_cart_context(request))
@@ -560,7 +705,7 @@ def profile(request):
             profile.phone = phone
             profile.save()
 
-            logger.info(f"User {user.email} updated their profile successfully.")
+            logger.info("User %s updated their profile successfully.", user.email)
             if request.content_type == 'application/json':
                 return JsonResponse({
                     'success': True,
@@ -570,7 +715,7 @@ def profile(request):
                 messages.success(request, "Profile updated successfully.")
                 return redirect('users:profile')
         except Exception as e:
-            logger.error(f"Error updating profile for user {user.email}: {str(e)}", exc_info=True)
+            logger.error("Error updating profile for user %s: %s", user.email, e, exc_info=True)
             if request.content_type == 'application/json':
                 return JsonResponse({
                     'success': False,
@@ -591,6 +736,7 @@ def profile(request):
 class UserProfileAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @method_decorator(conditional(user_profile_version))
     def get(self, request):
         user = request.user
         # Get or create the profile
@@ -604,4 +750,193 @@ class UserProfileAPIView(APIView):
                 'last_name': user.last_name,
                 'phone': profile.phone
             }
-        }, status=status.HTTP_200_OK)
\ No newline at end of file
+        }, status=status.HTTP_200_OK)
+# Cart API (protected by JWT)
+class CartAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        cart = get_cart(request.user)
+        return Response({
+            'success': True,
+            'data': cart_payload(cart),
+        }, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        cart = get_cart(request.user)
+        cart.clear()
+        return Response({
+            'success': True,
+            'message': 'Cart cleared.',
+            'data': cart_payload(cart),
+        }, status=status.HTTP_200_OK)
+
+# Cart Item API (protected by JWT)
+class CartItemAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def _get_qty(self, request, default):
+        try:
+            return int(request.data.get('qty', default))
+        except (TypeError, ValueError):
+            return None
+
+    def post(self, request, menu_item_id):
+        menu_item = get_object_or_404(MenuItem, id=menu_item_id, is_available=True)
+        qty = self._get_qty(request, 1)
+        if qty is None or qty < 1:
+            return Response({
+                'success': False,
+                'message': 'Quantity must be a positive integer.',
+            }, status=status.HTTP_400_BAD_REQUEST)
+        cart = get_cart(request.user)
+        reset = cart.add(menu_item, qty)
+        if request.session.get('vendor_id') != menu_item.vendor_id:
+            request.session['vendor_id'] = menu_item.vendor_id
+        return Response({
+            'success': True,
+            'cart_reset': reset,
+            'data': cart_payload(cart),
+        }, status=status.HTTP_200_OK)
+
+    def put(self, request, menu_item_id):
+        qty = self._get_qty(request, None)
+        if qty is None or qty < 0:
+            return Response({
+                'success': False,
+                'message': 'Quantity must be zero or a positive integer.',
+            }, status=status.HTTP_400_BAD_REQUEST)
+        cart = get_cart(request.user)
+        if not cart.set_qty(menu_item_id, qty) and qty > 0:
+            return Response({
+                'success': False,
+                'message': 'Item is not in the cart.',
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'success': True,
+            'data': cart_payload(cart),
+        }, status=status.HTTP_200_OK)
+
+    def delete(self, request, menu_item_id):
+        cart = get_cart(request.user)
+        cart.remove(menu_item_id)
+        return Response({
+            'success': True,
+            'data': cart_payload(cart),
+        }, status=status.HTTP_200_OK)
+
+# Order Placement API (protected by JWT)
+class OrderPlaceAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        idempotency_key = request.headers.get('Idempotency-Key') or request.data.get('idempotency_key')
+        if idempotency_key is not None and not isinstance(idempotency_key, str):
+            return Response({
+                'success': False,
+                'message': 'Idempotency key must be a string.',
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if idempotency_key and len(idempotency_key) > 64:
+            return Response({
+                'success': False,
+                'message': 'Idempotency key must be at most 64 characters.',
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        items = request.data.get('items')
+        vendor_id = request.data.get('vendor_id')
+        from_cart = not items
+        if from_cart:
+            cart = get_cart(request.user)
+            items = dict(cart.lines.values_list('menu_item_id', 'qty'))
+            vendor_id = cart.vendor_id
+
+        errors = {
+            field: ['This field is required.']
+            for field in ('address', 'city', 'postal_code') if not request.data.get(field)
+        }
+        if not isinstance(items, dict):
+            errors['items'] = ['Expected an object mapping menu item id to quantity.']
+        if errors:
+            return Response({
+                'success': False,
+                'message': 'Invalid order data.',
+                'errors': errors,
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            order, created = place_order(
+                request.user, vendor_id, items,
+                address=request.data['address'],
+                city=request.data['city'],
+                postal_code=request.data['postal_code'],
+                idempotency_key=idempotency_key,
+                clear_cart=from_cart,
+            )
+        except OrderPlacementError as e:
+            return Response({
+                'success': False,
+                'message': str(e),
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'message': 'Order placed successfully.' if created else 'Order already placed.',
+            'data': {
+                'id': order.id,
+                'vendor_id': order.vendor_id,
+                'status': order.status,
+                'items': order.order_items,
+                'item_count': order.item_count,
+                'total_amount': float(order.total_amount),
+                'created_at': order.created_at.isoformat(),
+            },
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+# Order History API (protected by JWT)
+class OrderHistoryAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        statuses = {
+            'ongoing': ('ongoing',),
+            'past': PAST_ORDER_STATUSES,
+            'all': ('ongoing',) + PAST_ORDER_STATUSES,
+        }.get(request.query_params.get('status', 'all'))
+        if statuses is None:
+            return Response({
+                'success': False,
+                'message': 'status must be one of: ongoing, past, all.',
+            }, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', ORDER_HISTORY_PAGE_SIZE)), 1), 100)
+        except ValueError:
+            limit = ORDER_HISTORY_PAGE_SIZE
+
+        orders, next_cursor = paginate_by_cursor(
+            order_history_queryset(request.user, statuses),
+            cursor=request.query_params.get('cursor'),
+            limit=limit,
+        )
+        return Response({
+            'success': True,
+            'data': [order_summary(order) for order in orders],
+            'next_cursor': next_cursor,
+        }, status=status.HTTP_200_OK)
+
+# Order Detail API (protected by JWT)
+class OrderDetailAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, order_id):
+        order = get_object_or_404(OrderHistory.objects.select_related('vendor'), id=order_id, user=request.user)
+        data = order_summary(order)
+        data.update({
+            'items': order.order_items,
+            'address': order.user_address,
+            'city': order.user_city,
+            'postal_code': order.user_postal_code,
+        })
+        return Response({
+            'success': True,
+            'data': data,
+        }, status=status.HTTP_200_OK)